@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import argparse
+import multiprocessing
 
 from src.web.server import run
 
 MAX_UPLOAD_MB = 25
+MAX_CONCURRENT_RUNS = 2
 
 
 def main() -> None:
@@ -12,10 +14,19 @@ def main() -> None:
     parser.add_argument("--host", default="127.0.0.1")
     parser.add_argument("--port", type=int, default=8787)
     parser.add_argument("--no-open", action="store_true")
+    parser.add_argument("--max-runs", type=int, default=MAX_CONCURRENT_RUNS)
     args = parser.parse_args()
 
-    run(args.host, args.port, open_browser=not args.no_open)
+    run(
+        args.host,
+        args.port,
+        open_browser=not args.no_open,
+        max_concurrent_runs=args.max_runs,
+        max_upload_mb=MAX_UPLOAD_MB,
+    )
 
 
 if __name__ == "__main__":
+    # Run workers are spawned processes; needed for frozen (PyInstaller) builds.
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, replace
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable
+
+import polars as pl
+
+from src.core import input_cache, profiler, result_cache
+from src.core.io import read_csv, read_sample
+from src.core.mapping_guess import guess_mappings
+from src.core.profiler import profile_frame
+from src.core.runner import run_validation
+from src.core.transform_guess import guess_transformations
+from src.validators import run_rule
+
+from .synth import SynthSpec, generate, left_columns, mapping, right_name
+
+SIZES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+DEFAULT_SIZES = ["10k", "1m", "10m"]
+DATA_DIR = Path(__file__).resolve().parent / "data"
+# Results slower than baseline * threshold are flagged by --baseline.
+DEFAULT_THRESHOLD = 1.10
+# Differences below this are timer noise, whatever the ratio.
+NOISE_SECONDS = 0.005
+# Bump when cases are added or their inputs change, so old files are not
+# compared like for like.
+FORMAT_VERSION = 1
+
+
+def single_rules(spec: SynthSpec) -> list[dict[str, Any]]:
+    # One rule per validator module, each pointed at a column it has
+    # something to say about.
+    columns = left_columns(spec)
+    rules = [
+        {"type": "required_columns", "severity": "ERROR", "columns": columns},
+        {"type": "required_non_null", "severity": "WARN", "columns": columns[1:]},
+        {"type": "unique_key", "severity": "ERROR", "key": "id"},
+    ]
+    if "status" in columns:
+        rules.append({"type": "allowed_values", "column": "status", "values": ["active", "inactive", "pending", "closed"]})
+    if "email" in columns:
+        rules.append({"type": "regex", "column": "email", "pattern": r"^[^@\s]+@[^@\s]+\.[^@\s]+$"})
+    if "created" in columns:
+        rules.append({"type": "type_checks", "column": "created", "check": "date"})
+    rules.append({"type": "range", "column": "id", "min": 0, "max": spec.rows})
+    if "amount" in columns:
+        rules.append({"type": "row_rules", "expression": "amount = 'n/a'", "message": "Missing amount"})
+    return rules
+
+
+def compare_rules(spec: SynthSpec) -> list[dict[str, Any]]:
+    fields = [column for column in left_columns(spec) if column != "id"]
+    return [
+        {"type": "cross_file_match", "severity": "ERROR", "key": {"left": "id", "right": right_name("id")}},
+        {"type": "compare_fields", "severity": "WARN", "fields": fields, "ignore_if_both_blank": True},
+    ]
+
+
+def run_rules(spec: SynthSpec) -> list[dict[str, Any]]:
+    # The full run is a compare run, where column lists and keys name both
+    # sides.
+    rules = []
+    for rule in single_rules(spec):
+        if rule["type"] in ("required_columns", "required_non_null"):
+            columns = rule["columns"]
+            rule = {**rule, "columns": {"left": columns, "right": [right_name(column) for column in columns]}}
+        elif rule["type"] == "unique_key":
+            rule = {**rule, "key": {"left": "id", "right": right_name("id")}}
+        rules.append(rule)
+    return rules + compare_rules(spec)
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> dict[str, Any]:
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return {"seconds": min(runs), "median": statistics.median(runs), "runs": runs}
+
+
+def bench_size(spec: SynthSpec, repeat: int, data_dir: Path, log: Callable[[str], None]) -> list[dict[str, Any]]:
+    left_path, right_path = generate(spec, data_dir)
+    results: list[dict[str, Any]] = []
+
+    def case(name: str, fn: Callable[[], Any], rows: int = spec.rows) -> None:
+        result = {"case": name, "rows": rows, **measure(fn, repeat)}
+        result["rows_per_second"] = round(rows / result["seconds"]) if result["seconds"] else None
+        results.append(result)
+        log(f"{name:<32} {rows:>10} rows {result['seconds']:>9.3f}s")
+
+    case("read_csv:left", lambda: read_csv(left_path))
+    case("read_csv:right", lambda: read_csv(right_path))
+    df_left = read_csv(left_path)
+    df_right = read_csv(right_path)
+    pair_mapping = mapping(spec)
+    for rule in single_rules(spec):
+        case(f"validator:{rule['type']}", lambda rule=rule: run_rule(rule, df_left, None, "bench", "single"))
+    for rule in compare_rules(spec):
+        case(
+            f"validator:{rule['type']}",
+            lambda rule=rule: run_rule(rule, df_left, df_right, "bench", "compare", pair_mapping),
+        )
+    del df_left, df_right
+
+    # The wizard only ever sees bounded samples, so these are timed on the
+    # sample rather than the whole file; profiling is timed on its own.
+    sample_left = read_sample(left_path)
+    sample_right = read_sample(right_path)
+    left_profile = profile_frame(sample_left, sample_left.height)
+    right_profile = profile_frame(sample_right, sample_right.height)
+    case("profile:sample", lambda: profile_frame(sample_left, sample_left.height), sample_left.height)
+    case(
+        "guess_mappings",
+        lambda: guess_mappings(list(left_profile), list(right_profile), left_profile, right_profile),
+        sample_left.height,
+    )
+    case(
+        "guess_transformations",
+        lambda: guess_transformations(pair_mapping["fields"], left_profile, right_profile),
+        sample_left.height,
+    )
+
+    def full_run() -> None:
+        # A fresh runs folder each time, so no input, profile or result
+        # cache is warm: this is what a nightly run pays.
+        rules = {"mode": "compare", "validators": run_rules(spec), "result_cache": False}
+        with tempfile.TemporaryDirectory(dir=data_dir) as runs_dir:
+            try:
+                run_validation("compare", left_path, right_path, rules, pair_mapping, Path(runs_dir))
+            finally:
+                # Otherwise every repeat leaves its caches, and the frames
+                # they hold, alive in this process for the later cases.
+                for module in (input_cache, profiler, result_cache):
+                    module.forget(Path(runs_dir))
+
+    case("run_validation", full_run)
+    return results
+
+
+def git_revision() -> str | None:
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip() or None
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], threshold: float) -> list[str]:
+    # Cases are matched on name and row count; returns the regressed ones.
+    before = {(result["case"], result["rows"]): result["seconds"] for result in baseline.get("results", [])}
+    regressions = []
+    print(f"\n{'case':<32} {'rows':>10} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for result in current["results"]:
+        old = before.get((result["case"], result["rows"]))
+        if old is None:
+            continue
+        ratio = result["seconds"] / old if old else float("inf")
+        flag = " slower" if ratio > threshold and result["seconds"] - old > NOISE_SECONDS else ""
+        print(f"{result['case']:<32} {result['rows']:>10} {old:>9.3f}s {result['seconds']:>9.3f}s {ratio:>6.2f}x{flag}")
+        if flag:
+            regressions.append(f"{result['case']}@{result['rows']}")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Time the validator pipeline on synthetic CSV files.")
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES, help=f"any of {', '.join(SIZES)} or a row count")
+    parser.add_argument("--columns", type=int, default=SynthSpec.columns)
+    parser.add_argument("--null-rate", type=float, default=SynthSpec.null_rate)
+    parser.add_argument("--duplicate-rate", type=float, default=SynthSpec.duplicate_rate)
+    parser.add_argument("--key-overlap", type=float, default=SynthSpec.key_overlap)
+    parser.add_argument("--dirty-rate", type=float, default=SynthSpec.dirty_rate)
+    parser.add_argument("--seed", type=int, default=SynthSpec.seed)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR)
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="earlier results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    base = SynthSpec(
+        columns=args.columns,
+        null_rate=args.null_rate,
+        duplicate_rate=args.duplicate_rate,
+        key_overlap=args.key_overlap,
+        dirty_rate=args.dirty_rate,
+        seed=args.seed,
+    )
+    report: dict[str, Any] = {
+        "version": FORMAT_VERSION,
+        "created_at": datetime.now().isoformat(),
+        "git": git_revision(),
+        "python": platform.python_version(),
+        "polars": pl.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "repeat": args.repeat,
+        "spec": {name: value for name, value in asdict(base).items() if name != "rows"},
+        "results": [],
+    }
+    for size in args.sizes:
+        rows = SIZES.get(size.lower()) or int(size)
+        print(f"# {rows} rows", file=sys.stderr)
+        spec = replace(base, rows=rows)
+        report["results"] += bench_size(spec, args.repeat, args.data_dir, lambda line: print(line, file=sys.stderr))
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2))
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline.get("version") != FORMAT_VERSION:
+            print(f"Baseline format {baseline.get('version')} differs from {FORMAT_VERSION}; cases may not line up.", file=sys.stderr)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
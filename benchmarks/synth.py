@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+
+# Rows are written in chunks so 10M-row files never sit in memory whole.
+CHUNK_ROWS = 1_000_000
+BASE_COLUMNS = ["id", "name", "email", "phone", "amount", "status", "created"]
+# The right file uses different headers so the mapping guesser has work to do.
+RIGHT_NAMES = {
+    "id": "Customer ID",
+    "name": "Full Name",
+    "email": "Email Address",
+    "phone": "Phone Number",
+    "amount": "Amount",
+    "status": "Status",
+    "created": "Created Date",
+}
+STATUSES = ["active", "inactive", "pending", "closed"]
+FIRST_NAMES = ["Ana", "Ben", "Chloe", "Dev", "Eve", "Farid", "Grace", "Hugo", "Ines", "Jon"]
+LAST_NAMES = ["Smith", "Garcia", "Chen", "Okafor", "Novak", "Silva", "Khan", "Berg"]
+
+
+@dataclass(frozen=True)
+class SynthSpec:
+    rows: int = 10_000
+    columns: int = 10
+    null_rate: float = 0.02
+    duplicate_rate: float = 0.01
+    key_overlap: float = 0.9
+    dirty_rate: float = 0.05
+    seed: int = 42
+
+    def stem(self) -> str:
+        return (
+            f"r{self.rows}_c{self.columns}_n{self.null_rate}_d{self.duplicate_rate}"
+            f"_o{self.key_overlap}_x{self.dirty_rate}_s{self.seed}"
+        )
+
+
+def left_columns(spec: SynthSpec) -> list[str]:
+    extra = [f"attr_{i}" for i in range(max(spec.columns - len(BASE_COLUMNS), 0))]
+    return (BASE_COLUMNS + extra)[: max(spec.columns, 1)]
+
+
+def right_name(column: str) -> str:
+    if column in RIGHT_NAMES:
+        return RIGHT_NAMES[column]
+    return column.replace("attr_", "Attr ")
+
+
+def _values(keys: pl.Expr, column: str) -> pl.Expr:
+    # Clean values are a pure function of the record key, so a key present
+    # in both files carries the same values on both sides.
+    if column == "id":
+        return keys
+    if column == "name":
+        first = pl.lit(pl.Series(FIRST_NAMES)).gather(keys % len(FIRST_NAMES))
+        last = pl.lit(pl.Series(LAST_NAMES)).gather((keys // len(FIRST_NAMES)) % len(LAST_NAMES))
+        return pl.concat_str([first, last], separator=" ")
+    if column == "email":
+        return pl.format("user{}@example.com", keys)
+    if column == "phone":
+        return pl.format("555-{}", (keys % 10_000_000).cast(pl.String).str.zfill(7))
+    if column == "amount":
+        cents = (keys * 7919) % 1_000_000
+        return pl.format("{}.{}", cents // 100, (cents % 100).cast(pl.String).str.zfill(2))
+    if column == "status":
+        return pl.lit(pl.Series(STATUSES)).gather(keys % len(STATUSES))
+    if column == "created":
+        return (pl.date(2020, 1, 1) + pl.duration(days=keys % 2000)).cast(pl.String)
+    index = int(column.rsplit("_", 1)[1])
+    return pl.format("v{}", (keys * (index + 3)) % 997)
+
+
+def _dirty(column: str, value: pl.Expr, right: bool) -> pl.Expr:
+    # Each column gets the kind of damage the validators and the transform
+    # guesser look for.
+    if column == "email":
+        return value.str.to_uppercase() if right else value.str.replace("@", " at ", literal=True)
+    if column == "amount":
+        return pl.lit("n/a")
+    if column == "status":
+        return value.str.to_uppercase() if right else pl.lit("unknown")
+    if column == "created":
+        return value.str.replace_all("-", "/", literal=True)
+    return pl.concat_str([pl.lit("  "), value, pl.lit(" ")])
+
+
+def _chunk(
+    spec: SynthSpec,
+    keys: np.ndarray,
+    columns: list[str],
+    rng: np.random.Generator,
+    right: bool,
+) -> pl.DataFrame:
+    size = len(keys)
+    frame = pl.DataFrame({"__key": keys}, schema={"__key": pl.Int64})
+    exprs = []
+    for column in columns:
+        value = _values(pl.col("__key"), column)
+        if column == "id":
+            exprs.append(value.alias(column))
+            continue
+        value = value.cast(pl.String)
+        dirty = pl.lit(pl.Series(rng.random(size) < spec.dirty_rate))
+        null = pl.lit(pl.Series(rng.random(size) < spec.null_rate))
+        value = pl.when(dirty).then(_dirty(column, value, right)).otherwise(value)
+        exprs.append(pl.when(null).then(None).otherwise(value).alias(column))
+    frame = frame.select(exprs)
+    if right:
+        frame = frame.rename({column: right_name(column) for column in columns})
+    return frame
+
+
+def generate(spec: SynthSpec, directory: Path) -> tuple[Path, Path]:
+    # Writes <stem>_left.csv and <stem>_right.csv; the same spec always
+    # produces byte-identical files.
+    directory.mkdir(parents=True, exist_ok=True)
+    left_path = directory / f"{spec.stem()}_left.csv"
+    right_path = directory / f"{spec.stem()}_right.csv"
+    if left_path.exists() and right_path.exists():
+        return left_path, right_path
+    columns = left_columns(spec)
+    tmp_left = left_path.with_suffix(".tmp")
+    tmp_right = right_path.with_suffix(".tmp")
+    with tmp_left.open("wb") as left, tmp_right.open("wb") as right:
+        for number, start in enumerate(range(0, spec.rows, CHUNK_ROWS)):
+            rng = np.random.default_rng([spec.seed, number])
+            index = np.arange(start, min(start + CHUNK_ROWS, spec.rows), dtype=np.int64)
+            # Duplicates repeat an earlier key; right rows outside the
+            # overlap get keys the left file never uses.
+            left_keys = index.copy()
+            repeat = (rng.random(len(index)) < spec.duplicate_rate) & (index > 0)
+            left_keys[repeat] = rng.integers(0, index[repeat])
+            shared = rng.random(len(index)) < spec.key_overlap
+            right_keys = np.where(shared, index, index + spec.rows)
+            order = rng.permutation(len(index))
+            header = number == 0
+            _chunk(spec, left_keys, columns, rng, right=False).write_csv(left, include_header=header)
+            _chunk(spec, right_keys[order], columns, rng, right=True).write_csv(right, include_header=header)
+    tmp_left.replace(left_path)
+    tmp_right.replace(right_path)
+    return left_path, right_path
+
+
+def mapping(spec: SynthSpec) -> dict:
+    columns = left_columns(spec)
+    return {
+        "keys": {"left": "id", "right": right_name("id")},
+        "fields": {column: {"left": column, "right": right_name(column)} for column in columns if column != "id"},
+    }
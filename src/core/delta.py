@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import polars as pl
+
+from .issue_writer import COLUMNS, ISSUE_SCHEMA, bad_rows, first_per_side, remap_rows, severity_counts
+from .models import RuleResult
+from .rollup import rollup_issues
+from .rule_compiler import compile_rules, detail_limit
+from .run_index import feed_runs
+from .streaming import ROW_RULES
+from .utils import ensure_dir
+from ..validators import run_rule
+
+DELTA_DIR = "delta"
+ISSUES_FILE = "issues.parquet"
+# Row-rule issues of every row are kept so unchanged rows can be carried
+# forward exactly; run_id is filled in when they are reused.
+STATE_SCHEMA: dict[str, Any] = {
+    "rule": pl.Int64,
+    "key": pl.String,
+    **{name: dtype for name, dtype in ISSUE_SCHEMA.items() if name != "run_id"},
+}
+STATE_COLUMNS = list(STATE_SCHEMA)
+
+
+@dataclass
+class DeltaResult:
+    results: dict[int, RuleResult] = field(default_factory=dict)
+    report: dict[str, Any] = field(default_factory=dict)
+
+
+def delta_keys(rules: dict[str, Any], mapping: dict[str, Any] | None, mode: str) -> tuple[str | None, str | None]:
+    key = rules.get("delta_key")
+    if key is None:
+        key = (mapping or {}).get("keys")
+    if key is None:
+        validators = rules.get("validators", []) or []
+        key = next((rule.get("key") for rule in validators if rule.get("type") == "unique_key"), None)
+    if isinstance(key, dict):
+        return key.get("left"), key.get("right") if mode == "compare" else None
+    return key, None
+
+
+def feed_signature(
+    mode: str,
+    validators: list[dict[str, Any]],
+    keys: tuple[str | None, str | None],
+    columns: tuple[list[str], list[str]],
+) -> str:
+    # Row hashes and stored issues are only comparable between runs with the
+    # same row rules, keys, columns and Polars hashing.
+    payload = {
+        "mode": mode,
+        "rules": [rule for rule in validators if rule.get("type") in ROW_RULES],
+        "keys": keys,
+        "columns": columns,
+        "polars": pl.__version__,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def row_hashes(df: pl.DataFrame, key: str) -> pl.DataFrame:
+    return df.select(
+        pl.col(key).cast(pl.String).alias("key"),
+        pl.struct(pl.all()).hash(seed=0).alias("hash"),
+    ).with_row_index("row_index")
+
+
+def _previous_state(runs_dir: Path, feed: str, signature: str) -> tuple[str, Path] | None:
+    for run_id in feed_runs(runs_dir, feed, signature):
+        state_dir = runs_dir / run_id / DELTA_DIR
+        if (state_dir / ISSUES_FILE).exists():
+            return run_id, state_dir
+    return None
+
+
+def _unchanged(current: pl.DataFrame, previous: pl.DataFrame | None) -> pl.DataFrame:
+    # Rows whose key is missing or repeated on either side are always
+    # validated again, since they cannot be matched to a single earlier row.
+    if previous is None:
+        return current.head(0).select("key", "row_index")
+    unique = pl.col("key").is_not_null() & ~pl.col("key").is_duplicated()
+    return (
+        current.filter(unique)
+        .join(previous.filter(unique), on=["key", "hash"], how="inner")
+        .select("key", "row_index")
+    )
+
+
+def _evaluate(
+    rules: dict[int, dict[str, Any]],
+    df_left: pl.DataFrame,
+    df_right: pl.DataFrame | None,
+    run_id: str,
+    mode: str,
+    mapping: dict[str, Any] | None,
+) -> dict[int, RuleResult | None]:
+    right_columns = df_right.columns if df_right is not None else []
+    compiled = compile_rules(rules, mode, df_left.columns, right_columns)
+    try:
+        return compiled.run(df_left, df_right, run_id)
+    except Exception:
+        return {idx: run_rule(rule, df_left, df_right, run_id, mode, mapping) for idx, rule in rules.items()}
+
+
+def run_delta(
+    validators: list[dict[str, Any]],
+    df_left: pl.DataFrame,
+    df_right: pl.DataFrame | None,
+    run_id: str,
+    mode: str,
+    mapping: dict[str, Any] | None,
+    runs_dir: Path,
+    run_dir: Path,
+    feed: str,
+    keys: tuple[str | None, str | None],
+) -> DeltaResult:
+    frames = {"left": df_left, "right": df_right}
+    for side, key in zip(frames, keys):
+        if key is not None and frames[side] is not None and key not in frames[side].columns:
+            raise ValueError(f"Delta key column {key!r} not found in the {side} file")
+    columns = (df_left.columns, df_right.columns if df_right is not None else [])
+    signature = feed_signature(mode, validators, keys, columns)
+    previous = _previous_state(runs_dir, feed, signature)
+    state_dir = ensure_dir(run_dir / DELTA_DIR)
+
+    hashes: dict[str, pl.DataFrame] = {}
+    unchanged: dict[str, pl.DataFrame] = {}
+    changed: dict[str, pl.Series | None] = {"left": None, "right": None}
+    for side, key in zip(frames, keys):
+        frame = frames[side]
+        if frame is None:
+            continue
+        if key is None:
+            # Without a key this side is validated in full every run.
+            changed[side] = pl.Series("row_index", range(frame.height), dtype=pl.UInt32)
+            continue
+        hashes[side] = row_hashes(frame, key)
+        hashes[side].select("key", "hash").write_parquet(state_dir / f"{side}.parquet", compression="zstd")
+        prior = None
+        if previous is not None and (previous[1] / f"{side}.parquet").exists():
+            prior = pl.read_parquet(previous[1] / f"{side}.parquet")
+        unchanged[side] = _unchanged(hashes[side], prior)
+        changed[side] = hashes[side].join(unchanged[side], on="row_index", how="anti")["row_index"]
+
+    # Only new and changed rows go through the row rules; each rule keeps
+    # every violation so the next run can carry them forward.
+    rules = {
+        idx: {**rule, "max_detail": sys.maxsize}
+        for idx, rule in enumerate(validators)
+        if rule.get("type") in ROW_RULES
+    }
+    # Issues are stored by the rule's position among the row rules, so
+    # editing other validators does not invalidate them.
+    ordinals = {idx: position for position, idx in enumerate(rules)}
+    left_rows = df_left[changed["left"]]
+    right_rows = df_right[changed["right"]] if df_right is not None else None
+    outcomes = _evaluate(rules, left_rows, right_rows, run_id, mode, mapping)
+
+    keyed = {side: frame.select("key", pl.col("row_index").cast(pl.Int64)) for side, frame in hashes.items()}
+    is_right = pl.col("file_side") == "RIGHT"
+
+    def with_keys(issues: pl.DataFrame) -> pl.DataFrame:
+        parts = []
+        for side, mask in (("left", ~is_right), ("right", is_right)):
+            part = issues.filter(mask)
+            if side in keyed:
+                part = part.join(keyed[side], on="row_index", how="left")
+            else:
+                part = part.with_columns(pl.lit(None, dtype=pl.String).alias("key"))
+            parts.append(part)
+        return pl.concat(parts)
+
+    fresh = []
+    for idx, outcome in outcomes.items():
+        if outcome is None or outcome.issues.is_empty():
+            continue
+        issues = remap_rows(outcome.issues, changed["left"], changed["right"])
+        rule = pl.lit(ordinals[idx], dtype=pl.Int64).alias("rule")
+        fresh.append(with_keys(issues).with_columns(rule).select(STATE_COLUMNS))
+
+    carried = []
+    if previous is not None:
+        stored = pl.scan_parquet(previous[1] / ISSUES_FILE)
+        for side, mask in (("left", ~is_right), ("right", is_right)):
+            if side not in unchanged:
+                continue
+            rows = unchanged[side].select("key", pl.col("row_index").cast(pl.Int64))
+            carried.append(
+                stored.filter(mask)
+                .drop("row_index")
+                .join(rows.lazy(), on="key", how="inner")
+                .select(STATE_COLUMNS)
+                .collect()
+            )
+    carried_count = sum(frame.height for frame in carried)
+    state = pl.concat([pl.DataFrame(schema=STATE_SCHEMA)] + fresh + carried, how="vertical")
+    state.write_parquet(state_dir / ISSUES_FILE, compression="zstd")
+
+    result = DeltaResult()
+    by_rule = state.partition_by("rule", as_dict=True)
+    for idx in rules:
+        issues = by_rule.get((ordinals[idx],), state.head(0)).with_columns(
+            pl.lit(run_id, dtype=pl.String).alias("run_id")
+        ).select(COLUMNS)
+        detail = first_per_side(issues, detail_limit(validators[idx]))
+        result.results[idx] = RuleResult(detail, *bad_rows(detail), severity_counts(issues), rollup_issues(issues))
+    result.report = {
+        "feed": feed,
+        "signature": signature,
+        "previous_run": previous[0] if previous else None,
+        "validated_left": changed["left"].len() if changed["left"] is not None else 0,
+        "validated_right": changed["right"].len() if changed["right"] is not None else 0,
+        "carried_issues": carried_count,
+    }
+    return result
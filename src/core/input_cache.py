@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable
+
+import polars as pl
+
+from .io import read_csv, read_csv_columns, select_columns
+from .utils import ensure_dir, env_int
+
+DEFAULT_MEMORY_MB = env_int("CSV_VALIDATOR_CACHE_MB", 512)
+DEFAULT_DISK_MB = env_int("CSV_VALIDATOR_DISK_CACHE_MB", 2048)
+# Bump when read_csv's parsing options change so stale frames are ignored.
+FORMAT_VERSION = "1"
+CACHE_DIR_NAME = "_cache"
+
+
+def file_digest(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        while chunk := handle.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class InputCache:
+    def __init__(self, directory: Path, memory_mb: int | None = None, disk_mb: int | None = None):
+        self.directory = directory
+        self.memory_budget = (memory_mb if memory_mb is not None else DEFAULT_MEMORY_MB) * 1024 * 1024
+        self.disk_budget = (disk_mb if disk_mb is not None else DEFAULT_DISK_MB) * 1024 * 1024
+        # Columns are cached one by one, so a run only parses and stores the
+        # columns it reads and later runs can add the ones they need.
+        self._frames: OrderedDict[tuple[str, int], pl.DataFrame] = OrderedDict()
+        self._sizes: dict[tuple[str, int], int] = {}
+        self._digests: dict[tuple[str, int, int], str] = {}
+        self._lock = threading.Lock()
+
+    def key(self, path: Path) -> str:
+        # The content hash is only recomputed when the file's size or mtime change.
+        stat = path.stat()
+        fingerprint = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            digest = self._digests.get(fingerprint)
+        if digest is None:
+            digest = file_digest(path)
+            with self._lock:
+                self._digests[fingerprint] = digest
+        return f"{digest}-v{FORMAT_VERSION}"
+
+    def read(self, path: Path, columns: Iterable[str] | None = None) -> pl.DataFrame:
+        key = self.key(path)
+        header = read_csv_columns(path)
+        wanted = header if columns is None else select_columns(header, columns)
+        # Disk entries are named by header position, which is fixed for a
+        # given content hash.
+        slots = {name: (key, header.index(name)) for name in wanted}
+        parts: dict[str, pl.DataFrame] = {}
+        for name, slot in slots.items():
+            part = self._memory_get(slot)
+            if part is None:
+                part = self._disk_get(slot)
+                if part is not None:
+                    self._memory_put(slot, part)
+            if part is not None:
+                parts[name] = part
+        missing = [name for name in wanted if name not in parts]
+        if missing:
+            frame = read_csv(path, missing)
+            for name in frame.columns:
+                part = frame.select(name)
+                self._disk_put(slots[name], part)
+                self._memory_put(slots[name], part)
+                parts[name] = part
+            self._evict_disk()
+        return pl.concat([parts[name] for name in wanted], how="horizontal")
+
+    def _memory_get(self, key: tuple[str, int]) -> pl.DataFrame | None:
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is not None:
+                self._frames.move_to_end(key)
+            return frame
+
+    def _memory_put(self, key: tuple[str, int], frame: pl.DataFrame) -> None:
+        size = frame.estimated_size()
+        if size > self.memory_budget:
+            return
+        with self._lock:
+            self._frames[key] = frame
+            self._sizes[key] = size
+            self._frames.move_to_end(key)
+            while sum(self._sizes.values()) > self.memory_budget:
+                evicted, _ = self._frames.popitem(last=False)
+                self._sizes.pop(evicted, None)
+
+    def _disk_path(self, key: tuple[str, int]) -> Path:
+        return self.directory / key[0] / f"{key[1]}.arrow"
+
+    def _disk_get(self, key: tuple[str, int]) -> pl.DataFrame | None:
+        target = self._disk_path(key)
+        try:
+            frame = pl.read_ipc(target)
+            os.utime(target)
+        except (FileNotFoundError, pl.exceptions.ComputeError, OSError):
+            return None
+        return frame
+
+    def _disk_put(self, key: tuple[str, int], frame: pl.DataFrame) -> None:
+        if self.disk_budget <= 0:
+            return
+        target = self._disk_path(key)
+        ensure_dir(target.parent)
+        tmp = target.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            frame.write_ipc(tmp, compression="lz4")
+            os.replace(tmp, target)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+
+    def _evict_disk(self) -> None:
+        entries = []
+        # Also sweeps whole-file entries left by earlier versions.
+        for entry in self.directory.glob("**/*.arrow"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.disk_budget:
+                break
+            entry.unlink(missing_ok=True)
+            total -= size
+            if entry.parent != self.directory:
+                try:
+                    entry.parent.rmdir()
+                except OSError:
+                    pass
+
+
+_CACHES: dict[Path, InputCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def input_cache(runs_dir: Path) -> InputCache:
+    directory = runs_dir / CACHE_DIR_NAME
+    with _CACHES_LOCK:
+        if directory not in _CACHES:
+            _CACHES[directory] = InputCache(directory)
+        return _CACHES[directory]
+
+
+def forget(runs_dir: Path) -> None:
+    # For runs folders that are about to be deleted: the memory tier can
+    # hold up to memory_budget bytes of parsed frames otherwise.
+    with _CACHES_LOCK:
+        _CACHES.pop(runs_dir / CACHE_DIR_NAME, None)
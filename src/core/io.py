@@ -1,13 +1,28 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Iterable, Iterator
 import csv
+import io
 
 import polars as pl
 
 
-def read_csv(path: Path) -> pl.DataFrame:
-    return pl.read_csv(path, infer_schema_length=500, try_parse_dates=True)
+def scan_csv(path: Path) -> pl.LazyFrame:
+    return pl.scan_csv(path, infer_schema_length=500, try_parse_dates=True)
+
+
+def select_columns(header: list[str], columns: Iterable[str]) -> list[str]:
+    wanted = set(columns)
+    # Keep one column so the frame still reports the file's row count.
+    return [col for col in header if col in wanted] or header[:1]
+
+
+def read_csv(path: Path, columns: Iterable[str] | None = None) -> pl.DataFrame:
+    frame = scan_csv(path)
+    if columns is not None:
+        frame = frame.select(select_columns(read_csv_columns(path), columns))
+    return frame.collect()
 
 
 def read_csv_columns(path: Path) -> list[str]:
@@ -16,10 +31,91 @@ def read_csv_columns(path: Path) -> list[str]:
         return next(reader, [])
 
 
-def sample_values(df: pl.DataFrame, limit: int = 2000) -> dict[str, list[str]]:
-    sample = df.head(limit)
-    samples: dict[str, list[str]] = {}
-    for col in sample.columns:
-        values = sample.get_column(col).to_list()
-        samples[col] = [str(v) for v in values if v is not None][:limit]
-    return samples
+SAMPLE_ROWS = 2000
+SAMPLE_CHUNKS = 20
+# Files smaller than this are sampled from the top; seeking buys nothing.
+STRIDE_MIN_BYTES = 1024 * 1024
+
+
+def _lines(handle, end: int) -> Iterator[str]:
+    while handle.tell() < end:
+        line = handle.readline()
+        if not line:
+            return
+        yield line.decode("utf-8", errors="replace")
+
+
+def _stride_rows(path: Path, width: int, limit: int, chunks: int) -> list[list[str]]:
+    size = path.stat().st_size
+    per_chunk = max(1, limit // chunks)
+    rows: list[list[str]] = []
+    with path.open("rb") as handle:
+        handle.readline()
+        start = handle.tell()
+        offsets = [start + (size - start) * i // chunks for i in range(chunks)] + [size]
+        for i in range(chunks):
+            handle.seek(offsets[i])
+            if i:
+                # Resync to the next line start; rows split by the seek are
+                # dropped by the width check below.
+                handle.readline()
+            taken = 0
+            for row in csv.reader(_lines(handle, offsets[i + 1])):
+                if len(row) != width:
+                    continue
+                rows.append(row)
+                taken += 1
+                if taken >= per_chunk:
+                    break
+    return rows
+
+
+def read_sample(path: Path, limit: int = SAMPLE_ROWS, method: str = "stride") -> pl.DataFrame:
+    if method == "head" or path.stat().st_size < STRIDE_MIN_BYTES:
+        return scan_csv(path).head(limit).collect()
+    header = read_csv_columns(path)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    writer.writerows(_stride_rows(path, len(header), limit, SAMPLE_CHUNKS))
+    return pl.read_csv(io.BytesIO(buffer.getvalue().encode("utf-8")), infer_schema_length=500, try_parse_dates=True)
+
+
+ARTIFACT_FORMATS = {"csv": ".csv", "csv.gz": ".csv.gz", "parquet": ".parquet", "arrow": ".arrow"}
+DEFAULT_ARTIFACT_FORMAT = "csv"
+
+
+def artifact_name(stem: str, fmt: str) -> str:
+    return stem + ARTIFACT_FORMATS[fmt]
+
+
+def sink_artifact(frame: pl.LazyFrame, path: Path, fmt: str) -> None:
+    if fmt == "parquet":
+        # Row-group statistics let paged and filtered reads skip data.
+        frame.sink_parquet(path, compression="zstd", statistics=True, row_group_size=50_000)
+    elif fmt == "arrow":
+        frame.sink_ipc(path, compression="zstd")
+    else:
+        frame.sink_csv(path, compression="gzip" if fmt == "csv.gz" else "uncompressed")
+
+
+def write_rows(
+    source: Path,
+    row_indices: Iterable[int],
+    dest: Path,
+    fmt: str = DEFAULT_ARTIFACT_FORMAT,
+    frame: pl.DataFrame | None = None,
+) -> None:
+    # With the parsed source frame at hand the rows are gathered from it;
+    # otherwise the CSV is scanned, which keeps streaming runs bounded.
+    rows = pl.Series("rows", sorted(row_indices), dtype=pl.UInt32)
+    if frame is not None:
+        sink_artifact(frame[rows].lazy(), dest, fmt)
+        return
+    scanned = (
+        scan_csv(source)
+        .with_row_index("__row_index")
+        .filter(pl.col("__row_index").is_in(rows))
+        .drop("__row_index")
+    )
+    sink_artifact(scanned, dest, fmt)
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import Any
+
+import polars as pl
+
+from .issue_writer import COLUMNS, ISSUE_SCHEMA
+from .utils import write_json
+
+INDEX_FILE = "issues_index.json"
+FACETS = ("severity", "issue_type", "column", "file_side")
+DISPLAY_COLUMNS = COLUMNS[:10]
+SEARCH_COLUMNS = [name for name in COLUMNS if ISSUE_SCHEMA[name] == pl.String and name != "run_id"]
+MAX_PAGE = 1000
+
+
+def scan_issues(run_dir: Path) -> pl.LazyFrame | None:
+    # issues.parquet is written for every run; the other formats cover runs
+    # made before it existed or artifacts copied without it.
+    for name in ("issues.parquet", "issues.arrow", "issues.csv.gz", "issues.csv"):
+        path = run_dir / name
+        if not path.exists():
+            continue
+        if name.endswith(".parquet"):
+            return pl.scan_parquet(path)
+        if name.endswith(".arrow"):
+            return pl.scan_ipc(path)
+        return pl.scan_csv(path, schema_overrides=ISSUE_SCHEMA)
+    return None
+
+
+def build_index(issues: pl.DataFrame | pl.LazyFrame) -> dict[str, Any]:
+    frame = issues.lazy()
+    facets = {}
+    for name in FACETS:
+        counts = frame.group_by(name).len().sort(["len", name], descending=[True, False]).collect()
+        facets[name] = {value: count for value, count in counts.iter_rows() if value is not None}
+    total = frame.select(pl.len()).collect().item()
+    return {"total": total, "facets": facets}
+
+
+def write_issue_index(run_dir: Path, issues: pl.DataFrame) -> None:
+    write_json(run_dir / INDEX_FILE, build_index(issues))
+
+
+def load_issue_index(run_dir: Path) -> dict[str, Any] | None:
+    path = run_dir / INDEX_FILE
+    if path.exists():
+        return json.loads(path.read_text())
+    issues = scan_issues(run_dir)
+    if issues is None:
+        return None
+    index = build_index(issues)
+    write_json(path, index)
+    return index
+
+
+def _filters(
+    severity: str | None,
+    issue_type: str | None,
+    column: str | None,
+    search: str | None,
+) -> pl.Expr | None:
+    conditions = []
+    for name, value in (("severity", severity), ("issue_type", issue_type), ("column", column)):
+        if value:
+            conditions.append(pl.col(name) == value)
+    if search:
+        pattern = "(?i)" + re.escape(search)
+        text = [pl.col(name).str.contains(pattern) for name in SEARCH_COLUMNS]
+        conditions.append(pl.any_horizontal(text).fill_null(False))
+    if not conditions:
+        return None
+    return pl.all_horizontal(conditions)
+
+
+def query_issues(
+    run_dir: Path,
+    offset: int = 0,
+    limit: int = 100,
+    severity: str | None = None,
+    issue_type: str | None = None,
+    column: str | None = None,
+    search: str | None = None,
+) -> tuple[pl.DataFrame, int]:
+    issues = scan_issues(run_dir)
+    if issues is None:
+        return pl.DataFrame(schema={name: ISSUE_SCHEMA[name] for name in DISPLAY_COLUMNS}), 0
+    offset = max(0, offset)
+    limit = max(1, min(limit, MAX_PAGE))
+    condition = _filters(severity, issue_type, column, search)
+    if condition is None:
+        # Unfiltered totals come from the index; the page itself is a slice
+        # that only touches the row groups it needs.
+        index = load_issue_index(run_dir) or {}
+        return issues.select(DISPLAY_COLUMNS).slice(offset, limit).collect(), index.get("total", 0)
+    issues = issues.filter(condition)
+    page = issues.select(DISPLAY_COLUMNS).slice(offset, limit)
+    count = issues.select(pl.len())
+    if search:
+        # Text search cannot use parquet statistics, so the count and the
+        # page share a single scan.
+        count, page = pl.collect_all([count, page])
+        return page, count.item()
+    return page.collect(), count.collect().item()
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
-import csv
 from pathlib import Path
-from typing import Iterable
+from typing import Any, Iterable
 
+import polars as pl
+
+from .io import sink_artifact
 from .models import Issue
 
 
@@ -22,10 +24,85 @@ COLUMNS = [
     "tags",
 ]
 
+ISSUE_SCHEMA: dict[str, Any] = {
+    name: pl.Int64 if name == "row_index" else pl.String for name in COLUMNS
+}
+
+
+def empty_issues() -> pl.DataFrame:
+    return pl.DataFrame(schema=ISSUE_SCHEMA)
+
+
+def issue_frame(frame: pl.DataFrame, **values: Any) -> pl.DataFrame:
+    exprs = []
+    for name, dtype in ISSUE_SCHEMA.items():
+        if name in values:
+            expr = pl.lit(values[name], dtype=dtype)
+        elif name in frame.columns:
+            expr = pl.col(name).cast(dtype)
+        else:
+            expr = pl.lit(None, dtype=dtype)
+        exprs.append(expr.alias(name))
+    return frame.select(exprs)
+
+
+def issues_to_frame(issues: Iterable[Issue]) -> pl.DataFrame:
+    rows = [issue.to_row() for issue in issues]
+    if not rows:
+        return empty_issues()
+    return pl.DataFrame(rows, schema=ISSUE_SCHEMA)
+
+
+def concat_issues(frames: Iterable[pl.DataFrame]) -> pl.DataFrame:
+    frames = [frame for frame in frames if frame.height]
+    if not frames:
+        return empty_issues()
+    return pl.concat(frames, how="vertical")
+
+
+def remap_rows(issues: pl.DataFrame, left_index: pl.Series, right_index: pl.Series | None) -> pl.DataFrame:
+    # Maps row_index from positions in a subset of rows back to source rows.
+    if issues.is_empty():
+        return issues
+    issues = issues.with_row_index("__order")
+    is_right = pl.col("file_side") == "RIGHT"
+    parts = []
+    for mask, index in ((~is_right, left_index), (is_right, right_index)):
+        part = issues.filter(mask)
+        if part.height and index is not None:
+            part = part.with_columns(index.gather(part["row_index"]).cast(pl.Int64).alias("row_index"))
+        parts.append(part)
+    return pl.concat(parts).sort("__order").drop("__order")
+
+
+def head_per_side(issues: pl.DataFrame, limit: int) -> pl.DataFrame:
+    return issues.filter(pl.int_range(pl.len()).over("file_side") < limit)
+
+
+def first_per_side(issues: pl.DataFrame, limit: int) -> pl.DataFrame:
+    issues = issues.sort(["file_side", "row_index"], nulls_last=True, maintain_order=True)
+    return head_per_side(issues, limit)
+
+
+def bad_rows(issues: pl.DataFrame) -> tuple[set[int], set[int]]:
+    rows = issues.filter(pl.col("row_index").is_not_null())
+    right = pl.col("file_side") == "RIGHT"
+    return (
+        set(rows.filter(~right)["row_index"].to_list()),
+        set(rows.filter(right)["row_index"].to_list()),
+    )
+
+
+def paired_keys(issues: pl.DataFrame) -> set[str]:
+    # Pair issues (file_side BOTH) carry the left row; the right row they
+    # were compared with is only known by its record key.
+    pairs = issues.filter(pl.col("file_side") == "BOTH")
+    return set(pairs["record_key"].drop_nulls().to_list())
+
+
+def severity_counts(issues: pl.DataFrame) -> dict[str, int]:
+    return dict(issues.group_by("severity").len().iter_rows())
+
 
-def write_issues(path: Path, issues: Iterable[Issue]) -> None:
-    with path.open("w", newline="", encoding="utf-8") as handle:
-        writer = csv.DictWriter(handle, fieldnames=COLUMNS)
-        writer.writeheader()
-        for issue in issues:
-            writer.writerow(issue.to_row())
+def write_issues(path: Path, issues: pl.DataFrame, fmt: str = "csv") -> None:
+    sink_artifact(issues.lazy().select(COLUMNS), path, fmt)
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import json
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from .runner import run_validation
+from .utils import ensure_dir, generate_run_id, write_json
+
+STATUS_FILE = "status.json"
+
+
+def read_status(run_dir: Path) -> dict[str, Any] | None:
+    path = run_dir / STATUS_FILE
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def write_status(run_dir: Path, state: str, **extra: Any) -> None:
+    payload = read_status(run_dir) or {}
+    payload.update(extra)
+    payload["state"] = state
+    payload[f"{state}_at"] = datetime.now().isoformat()
+    write_json(run_dir / STATUS_FILE, payload)
+
+
+def _execute(
+    run_id: str,
+    mode: str,
+    left_path: Path,
+    right_path: Path | None,
+    rules: dict[str, Any],
+    mapping: dict[str, Any] | None,
+    runs_dir: Path,
+) -> None:
+    run_dir = runs_dir / run_id
+    write_status(run_dir, "running")
+    try:
+        run_validation(mode, left_path, right_path, rules, mapping, runs_dir, run_id=run_id)
+    except Exception as exc:
+        write_status(run_dir, "failed", error=str(exc) or exc.__class__.__name__)
+        return
+    write_status(run_dir, "done")
+
+
+class JobQueue:
+    def __init__(self, runs_dir: Path, max_workers: int = 2):
+        self.runs_dir = runs_dir
+        self.max_workers = max(1, max_workers)
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Polars is multi-threaded, so workers must not be forked.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def _submit(self, *args: Any) -> Future:
+        with self._lock:
+            try:
+                return self._pool().submit(_execute, *args)
+            except BrokenProcessPool:
+                # A dead worker (e.g. killed for memory) breaks the whole
+                # pool; its runs are already marked failed, so start afresh.
+                broken, self._executor = self._executor, None
+                if broken is not None:
+                    broken.shutdown(wait=False, cancel_futures=True)
+                return self._pool().submit(_execute, *args)
+
+    def submit(
+        self,
+        mode: str,
+        left_path: Path,
+        right_path: Path | None,
+        rules: dict[str, Any],
+        mapping: dict[str, Any] | None,
+    ) -> str:
+        run_id = generate_run_id()
+        run_dir = ensure_dir(self.runs_dir / run_id)
+        write_status(run_dir, "queued", mode=mode)
+        try:
+            future = self._submit(run_id, mode, left_path, right_path, rules, mapping, self.runs_dir)
+        except Exception as exc:
+            write_status(run_dir, "failed", error=f"Could not start the run: {exc or exc.__class__.__name__}")
+            return run_id
+        future.add_done_callback(lambda done: self._on_done(run_dir, done))
+        return run_id
+
+    def _on_done(self, run_dir: Path, future: Future) -> None:
+        # A worker that dies (e.g. killed for memory) never writes its own status.
+        if future.cancelled():
+            write_status(run_dir, "failed", error="Cancelled before it started")
+            return
+        exc = future.exception()
+        if exc is not None:
+            write_status(run_dir, "failed", error=str(exc) or exc.__class__.__name__)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
@@ -1,78 +1,90 @@
 from __future__ import annotations
 
-from collections import Counter
-from typing import Iterable
+from typing import Any
 
-from rapidfuzz import fuzz
+import numpy as np
+from rapidfuzz import fuzz, process
 
 from .models import MappingSuggestion
-from .normalize import digits_only
 
 
 def _norm_header(name: str) -> str:
     return "".join(ch.lower() for ch in name if ch.isalnum())
 
 
-def _detect_type(values: Iterable[str]) -> str:
-    sample = list(values)[:200]
-    if not sample:
-        return "text"
-    numeric = sum(v.replace(".", "", 1).isdigit() for v in sample)
-    emails = sum("@" in v for v in sample)
-    phones = sum(len(digits_only(v) or "") >= 10 for v in sample)
-    dates = sum("/" in v or "-" in v for v in sample)
-    best = max(
-        [(numeric, "numeric"), (emails, "email"), (phones, "phone"), (dates, "date")],
-        key=lambda item: item[0],
-    )
-    return best[1] if best[0] > 0 else "text"
+def _value_set(profile: dict[str, Any]) -> set[str]:
+    return {v.strip().lower() for v in profile.get("values") or [] if v}
 
 
-def _overlap(values_left: list[str], values_right: list[str]) -> float:
-    left = {v.strip().lower() for v in values_left if v}
-    right = {v.strip().lower() for v in values_right if v}
-    if not left or not right:
-        return 0.0
-    return len(left & right) / max(len(left), 1)
+def _overlap_counts(left_sets: list[set[str]], right_sets: list[set[str]]) -> np.ndarray:
+    # Counts shared values for every column pair through an inverted index,
+    # so the work follows the number of shared values, not the pair count.
+    right_index: dict[str, list[int]] = {}
+    for j, values in enumerate(right_sets):
+        for value in values:
+            right_index.setdefault(value, []).append(j)
+    left_index: dict[str, list[int]] = {}
+    for i, values in enumerate(left_sets):
+        for value in values:
+            if value in right_index:
+                left_index.setdefault(value, []).append(i)
+    counts = np.zeros((len(left_sets), len(right_sets)), dtype=np.int64)
+    for value, rows in left_index.items():
+        counts[np.ix_(rows, right_index[value])] += 1
+    return counts
 
 
 def guess_mappings(
     left_columns: list[str],
     right_columns: list[str],
-    left_samples: dict[str, list[str]],
-    right_samples: dict[str, list[str]],
+    left_profile: dict[str, dict[str, Any]],
+    right_profile: dict[str, dict[str, Any]],
 ) -> list[MappingSuggestion]:
     suggestions: list[MappingSuggestion] = []
-    right_norm = {col: _norm_header(col) for col in right_columns}
-    right_types = {col: _detect_type(right_samples.get(col, [])) for col in right_columns}
+    if not right_columns:
+        return [MappingSuggestion(left_column=left, best_right=None, confidence=0, reasons=[]) for left in left_columns]
 
-    for left in left_columns:
-        left_norm = _norm_header(left)
-        left_type = _detect_type(left_samples.get(left, []))
+    # Types and distinct values come from the column profiles; every pair is
+    # then scored as a matrix.
+    left_norm = [_norm_header(col) for col in left_columns]
+    right_norm = [_norm_header(col) for col in right_columns]
+    header = process.cdist(left_norm, right_norm, scorer=fuzz.ratio, dtype=np.float64, workers=-1)
+    left_types = np.array([left_profile.get(col, {}).get("type", "text") for col in left_columns], dtype=object)
+    right_types = np.array([right_profile.get(col, {}).get("type", "text") for col in right_columns], dtype=object)
+    same_type = left_types[:, None] == right_types[None, :]
+    left_sets = [_value_set(left_profile.get(col, {})) for col in left_columns]
+    right_sets = [_value_set(right_profile.get(col, {})) for col in right_columns]
+    left_sizes = np.array([len(values) for values in left_sets], dtype=np.float64)
+    right_empty = np.array([not values for values in right_sets])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        overlap = _overlap_counts(left_sets, right_sets) / left_sizes[:, None]
+    overlap = np.where((left_sizes[:, None] == 0) | right_empty[None, :], 0.0, overlap)
+    overlap_score = (overlap * 100).astype(np.int64)
+    type_score = np.where(same_type, 15, 0)
+    confidence = np.minimum(100, (header * 0.6 + type_score + overlap_score * 0.4).astype(np.int64))
+
+    for i, left in enumerate(left_columns):
+        # Ties keep the right file's column order.
+        top = np.argsort(-confidence[i], kind="stable")[:3]
         scored: list[tuple[str, int, list[str]]] = []
-        for right in right_columns:
+        for j in top:
             reasons = []
-            header_score = 100 if left_norm == right_norm[right] else fuzz.ratio(left_norm, right_norm[right])
+            header_score = 100 if left_norm[i] == right_norm[j] else float(header[i, j])
             if header_score:
                 reasons.append(f"header fuzzy {header_score}")
-            type_score = 15 if left_type == right_types[right] else 0
-            if type_score:
-                reasons.append(f"type {left_type}")
-            overlap_score = int(_overlap(left_samples.get(left, []), right_samples.get(right, [])) * 100)
-            if overlap_score:
-                reasons.append(f"overlap {overlap_score}%")
-            confidence = min(100, int(header_score * 0.6 + type_score + overlap_score * 0.4))
-            scored.append((right, confidence, reasons))
-        scored.sort(key=lambda item: item[1], reverse=True)
-        best = scored[0] if scored else (None, 0, [])
-        alternates = scored[1:3] if len(scored) > 1 else []
+            if type_score[i, j]:
+                reasons.append(f"type {left_types[i]}")
+            if overlap_score[i, j]:
+                reasons.append(f"overlap {overlap_score[i, j]}%")
+            scored.append((right_columns[j], int(confidence[i, j]), reasons))
+        best = scored[0]
         suggestions.append(
             MappingSuggestion(
                 left_column=left,
                 best_right=best[0],
                 confidence=best[1],
                 reasons=best[2],
-                alternates=alternates,
+                alternates=scored[1:],
             )
         )
     return suggestions
@@ -2,7 +2,9 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Literal
+from typing import Any, Literal, NamedTuple
+
+import polars as pl
 
 Severity = Literal["INFO", "WARN", "ERROR"]
 FileSide = Literal["SINGLE", "LEFT", "RIGHT", "BOTH"]
@@ -37,10 +39,22 @@ class Issue:
             "right_value": self.right_value,
             "message": self.message,
             "suggested_fix": self.suggested_fix,
-            "tags": ";".join(self.tags or []),
+            "tags": ";".join(self.tags) if self.tags else None,
         }
 
 
+class RuleResult(NamedTuple):
+    issues: pl.DataFrame
+    bad_left: set[int]
+    bad_right: set[int]
+    # Exact number of violations per severity; issues holds at most
+    # max_detail of them.
+    counts: dict[str, int]
+    # Issues grouped by type, column and value over every violation; when
+    # None the runner rolls up the detail frame instead.
+    rollup: pl.DataFrame | None = None
+
+
 @dataclass
 class RunSummary:
     run_id: str
@@ -3,6 +3,8 @@ from __future__ import annotations
 import re
 from typing import Callable
 
+import polars as pl
+
 NormalizationFn = Callable[[str | None], str | None]
 
 
@@ -106,3 +108,96 @@ def apply_pipeline(value: str | None, steps: list[str]) -> str | None:
         if fn:
             result = fn(result)
     return result
+
+
+# Expression forms of NORMALIZERS. Each step is a list of primitive string
+# operations so a pipeline can be flattened and redundant strips dropped.
+_STRIP = ("strip",)
+_LOWER = ("lower",)
+_UPPER = ("upper",)
+_COLLAPSE = ("replace", r"\s+", " ")
+_DIGITS = ("replace", r"\D", "")
+_PUNCTUATION = ("replace", r"[^\w\s]", "")
+_SUFFIX = ("replace", r"(?i)(^| )\.*(" + "|".join(sorted(SUFFIXES)) + r")\.*$", "")
+_NULL_IF_EMPTY = ("null_if_empty",)
+_PHONE_US = ("phone_us",)
+
+STEP_OPS: dict[str, list[tuple]] = {
+    "trim": [_STRIP],
+    "lower": [_STRIP, _LOWER],
+    "upper": [_STRIP, _UPPER],
+    "collapse_whitespace": [_STRIP, _COLLAPSE],
+    "remove_punctuation": [_STRIP, _PUNCTUATION],
+    "digits_only": [_DIGITS, _NULL_IF_EMPTY],
+    "null_if_blank": [_STRIP, _NULL_IF_EMPTY],
+    "normalize_email": [_STRIP, _LOWER],
+    "normalize_phone_us": [_DIGITS, _NULL_IF_EMPTY, _PHONE_US],
+    "remove_suffixes": [_STRIP, _COLLAPSE, _SUFFIX, _NULL_IF_EMPTY],
+}
+
+_MAKES_STRIPPED = {_STRIP, _DIGITS}
+_KEEPS_STRIPPED = {_LOWER, _UPPER, _COLLAPSE, _SUFFIX, _NULL_IF_EMPTY, _PHONE_US}
+_IDEMPOTENT = {_STRIP, _LOWER, _UPPER, _COLLAPSE, _DIGITS, _PUNCTUATION, _NULL_IF_EMPTY}
+
+
+def compile_ops(steps: list[str]) -> list[tuple]:
+    ops: list[tuple] = []
+    stripped = False
+    for step in steps:
+        for op in STEP_OPS.get(step, []):
+            if (op == _STRIP and stripped) or (ops and ops[-1] == op and op in _IDEMPOTENT):
+                continue
+            ops.append(op)
+            if op in _MAKES_STRIPPED:
+                stripped = True
+            elif op not in _KEEPS_STRIPPED:
+                stripped = False
+    return ops
+
+
+def _op_expr(expr: pl.Expr, op: tuple) -> pl.Expr:
+    name = op[0]
+    if name == "strip":
+        return expr.str.strip_chars()
+    if name == "lower":
+        return expr.str.to_lowercase()
+    if name == "upper":
+        return expr.str.to_uppercase()
+    if name == "replace":
+        return expr.str.replace_all(op[1], op[2])
+    if name == "null_if_empty":
+        return pl.when(expr == "").then(None).otherwise(expr)
+    if name == "phone_us":
+        return (
+            pl.when((expr.str.len_chars() == 11) & expr.str.starts_with("1"))
+            .then(expr.str.slice(1))
+            .otherwise(expr)
+        )
+    raise ValueError(f"Unknown normalization op: {name}")
+
+
+def pipeline_expr(expr: pl.Expr, steps: list[str]) -> pl.Expr:
+    expr = expr.cast(pl.String)
+    for op in compile_ops(steps):
+        expr = _op_expr(expr, op)
+    return expr
+
+
+def normalize_series(series: pl.Series, steps: list[str], value_map: dict | None = None) -> pl.Series:
+    series = series.cast(pl.String)
+    if not compile_ops(steps) and not value_map:
+        return series
+    name = series.name
+    uniques = series.drop_nulls().unique()
+    # Low-cardinality columns run the pipeline once per distinct value and
+    # map the results back; high-cardinality ones run it over the column.
+    dictionary = uniques.len() * 2 <= series.len()
+    source = uniques if dictionary else series
+    expr = pipeline_expr(pl.col(name), steps)
+    if value_map:
+        mapping = {str(key): None if value is None else str(value) for key, value in value_map.items()}
+        expr = expr.replace(mapping)
+    normalized = source.to_frame(name).select(expr.alias(name)).to_series()
+    if not dictionary:
+        return normalized
+    return series.replace_strict(uniques, normalized, default=None, return_dtype=pl.String)
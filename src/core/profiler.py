@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+import polars as pl
+
+from .input_cache import input_cache
+from .io import SAMPLE_ROWS, read_sample
+from .utils import ensure_dir
+
+PROFILE_FILE = "profile.json"
+PROFILE_DIR_NAME = "_profiles"
+# Bump when the profile's fields or pattern rules change.
+FORMAT_VERSION = "1"
+PATTERNS = ("numeric", "email", "phone", "date")
+MAX_CACHED = 1000
+MEMORY_ENTRIES = 64
+
+
+def _pattern_exprs(text: pl.Expr) -> dict[str, pl.Expr]:
+    # Each class is one anchored match: digits with at most one decimal
+    # point, an "@", ten or more digits anywhere, a date separator.
+    return {
+        "numeric": text.str.contains(r"^(?:[0-9]+\.?[0-9]*|\.[0-9]+)$"),
+        "email": text.str.contains("@", literal=True),
+        "phone": text.str.contains(r"^(?:\D*\d){10}"),
+        "date": text.str.contains(r"[/-]"),
+    }
+
+
+def detect_type(patterns: dict[str, int]) -> str:
+    # The most common pattern class wins; ties go to the earlier class.
+    count, name = max(((patterns.get(name, 0), name) for name in PATTERNS), key=lambda item: item[0])
+    return name if count > 0 else "text"
+
+
+def profile_frame(frame: pl.DataFrame | pl.LazyFrame, max_values: int = 0) -> dict[str, dict[str, Any]]:
+    # Every statistic of every column comes out of one select, so the data is
+    # scanned once.
+    lazy = frame.lazy()
+    schema = lazy.collect_schema()
+    # Columns are cast to text once rather than inside every expression.
+    lazy = lazy.with_columns(pl.col(name).cast(pl.String).alias(f"__text{i}") for i, name in enumerate(schema))
+    exprs: list[pl.Expr] = [pl.len().alias("rows")]
+    for i, (name, dtype) in enumerate(schema.items()):
+        col = pl.col(name)
+        text = pl.col(f"__text{i}")
+        length = text.str.len_chars()
+        stats = {
+            "nulls": col.null_count(),
+            "distinct": col.drop_nulls().n_unique(),
+            "min": col.min().cast(pl.String),
+            "max": col.max().cast(pl.String),
+            "min_length": length.min(),
+            "mean_length": length.mean(),
+            "max_length": length.max(),
+            "edge_whitespace": (text != text.str.strip_chars()).sum(),
+            "repeated_whitespace": text.str.contains(r"\s{2,}").sum(),
+        }
+        stats.update({f"pattern_{key}": expr.sum() for key, expr in _pattern_exprs(text).items()})
+        if max_values:
+            stats["values"] = text.drop_nulls().unique(maintain_order=True).head(max_values).implode()
+        exprs += [expr.alias(f"{i}:{key}") for key, expr in stats.items()]
+    row = lazy.select(exprs).collect().row(0, named=True)
+    rows = row["rows"]
+    profile: dict[str, dict[str, Any]] = {}
+    for i, (name, dtype) in enumerate(schema.items()):
+        stats = {key.split(":", 1)[1]: value for key, value in row.items() if key.startswith(f"{i}:")}
+        patterns = {key: int(stats.pop(f"pattern_{key}") or 0) for key in PATTERNS}
+        mean_length = stats.pop("mean_length")
+        profile[name] = {
+            "dtype": str(dtype),
+            "rows": rows,
+            "null_rate": round(stats["nulls"] / rows, 4) if rows else 0.0,
+            **stats,
+            "mean_length": round(mean_length, 2) if mean_length is not None else None,
+            "patterns": patterns,
+            "type": detect_type(patterns),
+        }
+    return profile
+
+
+class ProfileCache:
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self._profiles: OrderedDict[str, dict[str, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> dict[str, dict[str, Any]] | None:
+        with self._lock:
+            profile = self._profiles.get(key)
+            if profile is not None:
+                self._profiles.move_to_end(key)
+                return profile
+        target = self.directory / f"{key}.json"
+        try:
+            profile = json.loads(target.read_text())
+            os.utime(target)
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+        self._remember(key, profile)
+        return profile
+
+    def put(self, key: str, profile: dict[str, dict[str, Any]]) -> None:
+        self._remember(key, profile)
+        ensure_dir(self.directory)
+        target = self.directory / f"{key}.json"
+        tmp = target.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            tmp.write_text(json.dumps(profile, default=str))
+            os.replace(tmp, target)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+            return
+        # Profiles are small; the cache is bounded by entry count.
+        entries = sorted(self.directory.glob("*.json"), key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:-MAX_CACHED]:
+            entry.unlink(missing_ok=True)
+
+    def _remember(self, key: str, profile: dict[str, dict[str, Any]]) -> None:
+        with self._lock:
+            self._profiles[key] = profile
+            self._profiles.move_to_end(key)
+            while len(self._profiles) > MEMORY_ENTRIES:
+                self._profiles.popitem(last=False)
+
+
+_CACHES: dict[Path, ProfileCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def profile_cache(runs_dir: Path) -> ProfileCache:
+    directory = runs_dir / PROFILE_DIR_NAME
+    with _CACHES_LOCK:
+        if directory not in _CACHES:
+            _CACHES[directory] = ProfileCache(directory)
+        return _CACHES[directory]
+
+
+def forget(runs_dir: Path) -> None:
+    with _CACHES_LOCK:
+        _CACHES.pop(runs_dir / PROFILE_DIR_NAME, None)
+
+
+def _key(runs_dir: Path, path: Path, scope: str, content: bool) -> str:
+    if content:
+        # Runs have already hashed the file's content through the input cache.
+        fingerprint = input_cache(runs_dir).key(path)
+    else:
+        # The wizard never reads whole files, so its samples are keyed by
+        # the file's identity instead of its content.
+        stat = path.stat()
+        identity = f"{path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+        fingerprint = hashlib.sha256(identity.encode()).hexdigest()
+    return f"{fingerprint}-{scope}-p{FORMAT_VERSION}"
+
+
+def sample_profile(runs_dir: Path, path: Path, limit: int = SAMPLE_ROWS) -> dict[str, dict[str, Any]]:
+    # The mapping wizard's view of a file: the bounded sample, with each
+    # column's distinct values kept for matching.
+    cache = profile_cache(runs_dir)
+    key = _key(runs_dir, path, f"sample{limit}", content=False)
+    profile = cache.get(key)
+    if profile is None:
+        profile = profile_frame(read_sample(path, limit), max_values=limit)
+        cache.put(key, profile)
+    return profile
+
+
+def frame_profile(runs_dir: Path, path: Path, frame: pl.DataFrame) -> dict[str, dict[str, Any]]:
+    cache = profile_cache(runs_dir)
+    columns = hashlib.sha256(json.dumps(frame.columns).encode()).hexdigest()[:12]
+    key = _key(runs_dir, path, f"full{columns}", content=True)
+    profile = cache.get(key)
+    if profile is None:
+        profile = profile_frame(frame)
+        cache.put(key, profile)
+    return profile
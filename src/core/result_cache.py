@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import secrets
+import shutil
+import threading
+from pathlib import Path
+from typing import Any
+
+import polars as pl
+
+from .models import RuleResult
+from .rules_loader import referenced_columns
+from .utils import ensure_dir, env_int
+
+DEFAULT_DISK_MB = env_int("CSV_VALIDATOR_RESULT_CACHE_MB", 1024)
+# Bump when a validator's output changes so stale results are ignored.
+FORMAT_VERSION = "1"
+CACHE_DIR_NAME = "_results"
+
+
+def _columns(frame: pl.DataFrame | None, wanted: set[str] | None) -> list[tuple[str, str]]:
+    if frame is None:
+        return []
+    return [(name, str(dtype)) for name, dtype in frame.schema.items() if wanted is None or name in wanted]
+
+
+def result_key(
+    rule: dict[str, Any],
+    mode: str,
+    mapping: dict[str, Any] | None,
+    df_left: pl.DataFrame,
+    df_right: pl.DataFrame | None,
+    digests: tuple[str, str | None],
+) -> str:
+    # A rule's result depends on its config and on the columns it reads; the
+    # columns are fingerprinted by the source file's content hash plus their
+    # names and inferred types.
+    left, right = referenced_columns({"validators": [rule]}, mapping, mode)
+    payload: dict[str, Any] = {
+        "version": FORMAT_VERSION,
+        "rule": rule,
+        "mode": mode,
+        "left": [digests[0], _columns(df_left, left)],
+        "right": [digests[1], _columns(df_right, right)],
+    }
+    if rule.get("type") == "compare_fields":
+        mapping = mapping or {}
+        fields = mapping.get("fields") or {}
+        payload["mapping"] = {
+            "keys": mapping.get("keys"),
+            "fields": {name: fields.get(name) for name in rule.get("fields", []) or []},
+        }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, directory: Path, disk_mb: int | None = None):
+        self.directory = directory
+        self.disk_budget = (disk_mb if disk_mb is not None else DEFAULT_DISK_MB) * 1024 * 1024
+
+    def get(self, key: str, run_id: str) -> RuleResult | None:
+        target = self.directory / key
+        try:
+            meta = json.loads((target / "meta.json").read_text())
+            issues = pl.read_ipc(target / "issues.arrow")
+            rows = pl.read_ipc(target / "rows.arrow")
+            rollup = None
+            if meta["rollup"]:
+                rollup = pl.read_ipc(target / "rollup.arrow")
+            os.utime(target)
+        except (FileNotFoundError, KeyError, ValueError, pl.exceptions.ComputeError, OSError):
+            return None
+        right = pl.col("side") == "right"
+        return RuleResult(
+            issues.with_columns(pl.lit(run_id, dtype=pl.String).alias("run_id")),
+            set(rows.filter(~right)["row_index"].to_list()),
+            set(rows.filter(right)["row_index"].to_list()),
+            meta["counts"],
+            rollup,
+        )
+
+    def put(self, key: str, result: RuleResult) -> None:
+        if self.disk_budget <= 0:
+            return
+        target = self.directory / key
+        if target.exists():
+            return
+        tmp = ensure_dir(self.directory / f".{secrets.token_hex(8)}.tmp")
+        rows = pl.DataFrame(
+            {
+                "side": ["left"] * len(result.bad_left) + ["right"] * len(result.bad_right),
+                "row_index": sorted(result.bad_left) + sorted(result.bad_right),
+            },
+            schema={"side": pl.String, "row_index": pl.Int64},
+        )
+        try:
+            result.issues.write_ipc(tmp / "issues.arrow", compression="lz4")
+            rows.write_ipc(tmp / "rows.arrow", compression="lz4")
+            if result.rollup is not None:
+                result.rollup.write_ipc(tmp / "rollup.arrow", compression="lz4")
+            meta = {"counts": result.counts, "rollup": result.rollup is not None}
+            (tmp / "meta.json").write_text(json.dumps(meta))
+            # Another run may have stored the same result meanwhile.
+            os.replace(tmp, target)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            return
+        self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        entries = []
+        for entry in self.directory.iterdir():
+            if entry.name.startswith("."):
+                continue
+            try:
+                size = sum(part.stat().st_size for part in entry.iterdir())
+                entries.append((entry.stat().st_mtime, size, entry))
+            except FileNotFoundError:
+                continue
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.disk_budget:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+
+_CACHES: dict[Path, ResultCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def result_cache(runs_dir: Path) -> ResultCache:
+    directory = runs_dir / CACHE_DIR_NAME
+    with _CACHES_LOCK:
+        if directory not in _CACHES:
+            _CACHES[directory] = ResultCache(directory)
+        return _CACHES[directory]
+
+
+def forget(runs_dir: Path) -> None:
+    # Lets a throwaway runs folder be released along with its cache.
+    with _CACHES_LOCK:
+        _CACHES.pop(runs_dir / CACHE_DIR_NAME, None)
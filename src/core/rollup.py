@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Iterable
+
+import polars as pl
+
+from .io import sink_artifact
+from .issue_index import scan_issues
+from .issue_writer import ISSUE_SCHEMA
+from .models import RuleResult
+from .utils import env_int
+
+ROLLUP_FILE = "rollup.parquet"
+KEYS = ["severity", "issue_type", "file_side", "column", "left_value", "right_value"]
+SAMPLE_ROWS = 5
+ROLLUP_SCHEMA: dict[str, Any] = {
+    **{name: ISSUE_SCHEMA[name] for name in KEYS},
+    "count": pl.Int64,
+    "first_row": pl.Int64,
+    "last_row": pl.Int64,
+    "sample_rows": pl.List(pl.Int64),
+}
+COLUMNS = list(ROLLUP_SCHEMA)
+# Distinct groups kept per rule; the rest are folded into one group per
+# severity, issue type, side and column so counts still add up.
+MAX_GROUPS = env_int("CSV_VALIDATOR_ROLLUP_GROUPS", 10_000)
+OTHER_VALUE = "(other values)"
+
+
+def empty_rollup() -> pl.DataFrame:
+    return pl.DataFrame(schema=ROLLUP_SCHEMA)
+
+
+def _finish(grouped: pl.DataFrame, values: dict[str, Any]) -> pl.DataFrame:
+    exprs = []
+    for name, dtype in ROLLUP_SCHEMA.items():
+        if name in values:
+            expr = pl.lit(values[name], dtype=dtype)
+        elif name in grouped.columns:
+            expr = pl.col(name).cast(dtype)
+        else:
+            expr = pl.lit(None, dtype=dtype)
+        exprs.append(expr.alias(name))
+    # Largest groups first; ties follow the first offending row.
+    return grouped.select(exprs).sort(
+        ["count", "first_row"], descending=[True, False], nulls_last=True, maintain_order=True
+    )
+
+
+def rollup_issues(issues: pl.DataFrame, **values: Any) -> pl.DataFrame:
+    # Accepts full issue frames or narrow frames of flagged rows, with the
+    # columns that are constant for the whole frame passed as values.
+    if issues.is_empty():
+        return empty_rollup()
+    keys = [name for name in KEYS if name in issues.columns and name not in values]
+    rows = pl.col("row_index") if "row_index" in issues.columns else pl.lit(None, dtype=pl.Int64)
+    if "row_index" in issues.columns:
+        # Sorted once up front, the samples are each group's first rows;
+        # a top-k per group is far slower when most values are distinct.
+        issues = issues.sort("row_index", nulls_last=True, maintain_order=True)
+    grouped = issues.group_by(keys or [pl.lit(0).alias("__group")], maintain_order=True).agg(
+        pl.len().alias("count"),
+        rows.min().alias("first_row"),
+        rows.max().alias("last_row"),
+        rows.drop_nulls().head(SAMPLE_ROWS).alias("sample_rows"),
+    )
+    return _finish(grouped, values)
+
+
+def result_rollup(result: RuleResult) -> pl.DataFrame:
+    # Validators that see every violation report their own rollup; for the
+    # rest the detail frame is already complete.
+    if result.rollup is not None:
+        return result.rollup
+    return rollup_issues(result.issues)
+
+
+def merge_rollups(frames: Iterable[pl.DataFrame]) -> pl.DataFrame:
+    frames = [frame for frame in frames if frame.height]
+    if not frames:
+        return empty_rollup()
+    if len(frames) == 1:
+        return frames[0]
+    return _merge(pl.concat(frames, how="vertical"))
+
+
+def _merge(rollup: pl.DataFrame) -> pl.DataFrame:
+    grouped = (
+        rollup.group_by(KEYS, maintain_order=True)
+        .agg(
+            pl.col("count").sum(),
+            pl.col("first_row").min(),
+            pl.col("last_row").max(),
+            pl.col("sample_rows").explode().drop_nulls().bottom_k(SAMPLE_ROWS).sort(),
+        )
+    )
+    return _finish(grouped, {})
+
+
+def _is_other() -> pl.Expr:
+    return (pl.col("left_value") == OTHER_VALUE).fill_null(False) & pl.col("right_value").is_null()
+
+
+def cap_rollup(rollup: pl.DataFrame, limit: int = MAX_GROUPS) -> pl.DataFrame:
+    # Keeps the largest groups of a merged rollup. Groups that are folded
+    # away and show up again later start a new count, so once a rollup is
+    # capped only the folded totals are exact.
+    if rollup.height <= limit:
+        return rollup
+    other = _is_other()
+    ranked = rollup.filter(~other)
+    if ranked.height <= limit:
+        return rollup
+    folded = pl.concat([ranked.slice(limit), rollup.filter(other)]).with_columns(
+        pl.lit(OTHER_VALUE, dtype=pl.String).alias("left_value"),
+        pl.lit(None, dtype=pl.String).alias("right_value"),
+    )
+    return _finish(pl.concat([ranked.head(limit), _merge(folded)]), {})
+
+
+def is_capped(rollup: pl.DataFrame) -> bool:
+    return rollup.height > 0 and rollup.select(_is_other().any()).item()
+
+
+def shift_rollup(rollup: pl.DataFrame, offset: int) -> pl.DataFrame:
+    return rollup.with_columns(
+        pl.col("first_row") + offset,
+        pl.col("last_row") + offset,
+        pl.col("sample_rows").list.eval(pl.element() + offset),
+    )
+
+
+def remap_rollup(rollup: pl.DataFrame, left_index: pl.Series, right_index: pl.Series | None) -> pl.DataFrame:
+    if rollup.is_empty():
+        return rollup
+    # The indices must be increasing so that mapping keeps first_row,
+    # last_row and the sample order intact.
+    rollup = rollup.with_row_index("__order")
+    is_right = pl.col("file_side") == "RIGHT"
+    parts = []
+    for mask, index in ((~is_right, left_index), (is_right, right_index)):
+        part = rollup.filter(mask)
+        if not part.height or index is None:
+            parts.append(part)
+            continue
+        samples = (
+            part.select("__order", "sample_rows")
+            .explode("sample_rows")
+            .drop_nulls("sample_rows")
+            .with_columns(pl.lit(index).gather(pl.col("sample_rows")).cast(pl.Int64).alias("sample_rows"))
+            .group_by("__order")
+            .agg(pl.col("sample_rows"))
+        )
+        part = part.drop("sample_rows").join(samples, on="__order", how="left").with_columns(
+            pl.lit(index).gather(pl.col(name)).cast(pl.Int64).alias(name) for name in ("first_row", "last_row")
+        ).with_columns(pl.col("sample_rows").fill_null([]))
+        parts.append(part.select(rollup.columns))
+    return pl.concat(parts).sort("__order").drop("__order")
+
+
+def write_rollup(path: Path, rollup: pl.DataFrame, fmt: str = "csv") -> None:
+    frame = rollup.lazy().select(COLUMNS)
+    if fmt in ("csv", "csv.gz"):
+        # CSV has no list type; sample rows are joined like issue tags.
+        samples = pl.col("sample_rows").list.eval(pl.element().cast(pl.String)).list.join(";")
+        frame = frame.with_columns(samples)
+    sink_artifact(frame, path, fmt)
+
+
+def load_rollup(run_dir: Path, limit: int = 100) -> tuple[pl.DataFrame, int]:
+    path = run_dir / ROLLUP_FILE
+    if not path.exists():
+        # Runs from before rollups existed are summarized from their issue
+        # detail once and the result is kept alongside it.
+        issues = scan_issues(run_dir)
+        if issues is None:
+            return empty_rollup(), 0
+        write_rollup(path, rollup_issues(issues.collect()), "parquet")
+    rollup = pl.scan_parquet(path)
+    groups = rollup.select(pl.len())
+    page = rollup.head(max(1, limit))
+    groups, page = pl.collect_all([groups, page])
+    return page, groups.item()
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+import polars as pl
+
+from .issue_writer import concat_issues, empty_issues, issue_frame
+from .models import RuleResult
+from .rollup import merge_rollups, rollup_issues
+
+MAX_DETAIL = 5000
+
+
+def detail_limit(rule: dict[str, Any]) -> int:
+    value = rule.get("max_detail")
+    if value is None:
+        return MAX_DETAIL
+    return max(0, int(value))
+
+
+def no_issues() -> RuleResult:
+    return RuleResult(empty_issues(), set(), set(), {})
+
+
+@dataclass
+class Check:
+    mask: pl.Expr
+    severity: str
+    issue_type: str
+    message: str
+    file_side: str
+    column: str | None = None
+    value: pl.Expr | None = None
+    record_key: pl.Expr | None = None
+
+
+@dataclass
+class _Slot:
+    rule_idx: int
+    check: Check
+    mask: str
+    value: str | None
+    record_key: str | None
+
+
+class CompiledRules:
+    def __init__(self, rules: dict[int, dict[str, Any]], checks: dict[int, list[Check]]):
+        self.rules = rules
+        self.checks = checks
+
+    def __contains__(self, rule_idx: int) -> bool:
+        return rule_idx in self.rules
+
+    def _plan(self, side: str) -> tuple[list[_Slot], dict[str, pl.Expr]]:
+        slots: list[_Slot] = []
+        exprs: dict[str, pl.Expr] = {}
+        names: dict[str, str] = {}
+
+        def add(expr: pl.Expr | None, prefix: str) -> str | None:
+            # Identical value expressions (the same cast of the same column)
+            # become a single output column.
+            if expr is None:
+                return None
+            key = str(expr)
+            if key not in names:
+                names[key] = f"__{prefix}_{len(exprs)}"
+                exprs[names[key]] = expr
+            return names[key]
+
+        for rule_idx, checks in self.checks.items():
+            for check in checks:
+                if (check.file_side == "RIGHT") != (side == "right"):
+                    continue
+                mask = f"__mask_{len(exprs)}"
+                exprs[mask] = check.mask.fill_null(False)
+                slots.append(
+                    _Slot(rule_idx, check, mask, add(check.value, "value"), add(check.record_key, "key"))
+                )
+        return slots, exprs
+
+    def run(self, df_left: pl.DataFrame, df_right: pl.DataFrame | None, run_id: str) -> dict[int, RuleResult]:
+        results: dict[int, tuple[list[pl.DataFrame], set[int], set[int], dict[str, int], list[pl.DataFrame]]] = {
+            rule_idx: ([], set(), set(), {}, []) for rule_idx in self.rules
+        }
+        used: dict[tuple[int, str], int] = {}
+        for side, frame in (("left", df_left), ("right", df_right)):
+            slots, exprs = self._plan(side)
+            if not slots or frame is None:
+                continue
+            # One pass over the frame computes every mask; Polars shares
+            # common sub-expressions such as casts between rules.
+            evaluated = frame.lazy().select(**exprs).with_row_index("row_index").collect()
+            totals = evaluated.select(pl.col(slot.mask).sum() for slot in slots).row(0)
+            for slot, total in zip(slots, totals):
+                check = slot.check
+                frames, bad_left, bad_right, counts, rollups = results[slot.rule_idx]
+                counts[check.severity] = counts.get(check.severity, 0) + total
+                if not total:
+                    continue
+                columns = [pl.col("row_index")]
+                if slot.value:
+                    columns.append(pl.col(slot.value).alias("left_value"))
+                if slot.record_key:
+                    columns.append(pl.col(slot.record_key).alias("record_key"))
+                flagged = evaluated.filter(pl.col(slot.mask)).select(columns)
+                labels = {
+                    "severity": check.severity,
+                    "issue_type": check.issue_type,
+                    "file_side": check.file_side,
+                    "column": check.column,
+                }
+                rollups.append(rollup_issues(flagged, **labels))
+                remaining = detail_limit(self.rules[slot.rule_idx]) - used.get((slot.rule_idx, side), 0)
+                if remaining <= 0:
+                    continue
+                hits = flagged.head(remaining)
+                used[(slot.rule_idx, side)] = used.get((slot.rule_idx, side), 0) + hits.height
+                frames.append(issue_frame(hits, run_id=run_id, message=check.message, **labels))
+                (bad_right if side == "right" else bad_left).update(hits["row_index"].to_list())
+        return {
+            rule_idx: RuleResult(concat_issues(frames), bad_left, bad_right, counts, merge_rollups(rollups))
+            for rule_idx, (frames, bad_left, bad_right, counts, rollups) in results.items()
+        }
+
+
+def compile_rules(
+    rules: dict[int, dict[str, Any]],
+    mode: str,
+    left_columns: list[str],
+    right_columns: list[str],
+    types: set[str] | None = None,
+) -> CompiledRules:
+    from ..validators import VALIDATOR_MAP
+
+    compiled: dict[int, dict[str, Any]] = {}
+    checks: dict[int, list[Check]] = {}
+    for rule_idx, rule in rules.items():
+        validator_type = rule.get("type")
+        if types is not None and validator_type not in types:
+            continue
+        build = getattr(VALIDATOR_MAP.get(validator_type), "checks", None)
+        if build is None:
+            continue
+        compiled[rule_idx] = rule
+        checks[rule_idx] = build(rule, left_columns, right_columns, mode)
+    return CompiledRules(compiled, checks)
+
+
+def run_checks(
+    checks: list[Check],
+    df_left: pl.DataFrame,
+    df_right: pl.DataFrame | None,
+    run_id: str,
+    rule: dict[str, Any] | None = None,
+) -> RuleResult:
+    return CompiledRules({0: rule or {}}, {0: checks}).run(df_left, df_right, run_id)[0]
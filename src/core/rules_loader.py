@@ -3,8 +3,67 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any
 
+import polars as pl
 import yaml
 
 
 def load_rules(path: Path) -> dict[str, Any]:
     return yaml.safe_load(path.read_text()) if path.exists() else {}
+
+
+def _as_list(value: Any) -> list[str]:
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple, set)):
+        return [str(item) for item in value if item]
+    return [str(value)]
+
+
+def _sides(value: Any, mode: str) -> tuple[list[str], list[str]]:
+    if mode == "compare" and isinstance(value, dict):
+        return _as_list(value.get("left")), _as_list(value.get("right"))
+    return _as_list(value), []
+
+
+def referenced_columns(
+    rules: dict[str, Any],
+    mapping: dict[str, Any] | None,
+    mode: str,
+) -> tuple[set[str] | None, set[str] | None]:
+    # None means every column of that side is needed.
+    left: set[str] | None = set()
+    right: set[str] | None = set()
+    mapping = mapping or {}
+    mapping_fields = mapping.get("fields") or {}
+    for rule in rules.get("validators", []) or []:
+        validator_type = rule.get("type")
+        if validator_type == "row_rules":
+            try:
+                names = pl.sql_expr(rule.get("expression") or "").meta.root_names()
+            except Exception:
+                left = None
+                continue
+            if left is not None:
+                left.update(names)
+            continue
+        new_left: list[str] = []
+        new_right: list[str] = []
+        if validator_type == "compare_fields":
+            keys = mapping.get("keys") or {}
+            new_left += _as_list(keys.get("left"))
+            new_right += _as_list(keys.get("right"))
+            for field in rule.get("fields", []) or []:
+                field_map = mapping_fields.get(field) or {}
+                new_left += _as_list(field_map.get("left"))
+                new_right += _as_list(field_map.get("right"))
+        else:
+            new_left += _as_list(rule.get("column"))
+            for name in ("columns", "key"):
+                side_left, side_right = _sides(rule.get(name), mode)
+                new_left += side_left
+                new_right += side_right
+        if left is not None:
+            left.update(new_left)
+        if right is not None:
+            right.update(new_right)
+    return left, right
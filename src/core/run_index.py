@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Any
+
+INDEX_FILE = "_index.sqlite3"
+SORT_COLUMNS = ("run_id", "mode", "rows_left", "rows_right", "errors", "warnings", "infos")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    mode TEXT,
+    rows_left INTEGER,
+    rows_right INTEGER,
+    errors INTEGER,
+    warnings INTEGER,
+    infos INTEGER,
+    report TEXT
+)
+"""
+
+
+def _connect(runs_dir: Path) -> sqlite3.Connection:
+    path = runs_dir / INDEX_FILE
+    fresh = not path.exists()
+    runs_dir.mkdir(parents=True, exist_ok=True)
+    # Runs finish in several worker processes; wait on the lock rather than fail.
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(_SCHEMA)
+    for column in SORT_COLUMNS[1:]:
+        conn.execute(f"CREATE INDEX IF NOT EXISTS runs_{column} ON runs ({column}, run_id)")
+    if fresh:
+        _rebuild(conn, runs_dir)
+    return conn
+
+
+def _row(run_id: str, report: dict[str, Any]) -> tuple:
+    return (
+        run_id,
+        report.get("mode"),
+        report.get("rows_left", 0),
+        report.get("rows_right", 0),
+        report.get("errors", 0),
+        report.get("warnings", 0),
+        report.get("infos", 0),
+        json.dumps(report, default=str),
+    )
+
+
+def _upsert(conn: sqlite3.Connection, rows: list[tuple]) -> None:
+    conn.executemany("INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+
+def _rebuild(conn: sqlite3.Connection, runs_dir: Path) -> int:
+    rows = []
+    for report_path in runs_dir.glob("*/report.json"):
+        run_id = report_path.parent.name
+        if run_id.startswith("_"):
+            continue
+        try:
+            rows.append(_row(run_id, json.loads(report_path.read_text())))
+        except (OSError, ValueError):
+            continue
+    with conn:
+        conn.execute("DELETE FROM runs")
+        _upsert(conn, rows)
+    return len(rows)
+
+
+def record_run(runs_dir: Path, report: dict[str, Any]) -> None:
+    with closing(_connect(runs_dir)) as conn, conn:
+        _upsert(conn, [_row(report["run_id"], report)])
+
+
+def rebuild_index(runs_dir: Path) -> int:
+    with closing(_connect(runs_dir)) as conn:
+        return _rebuild(conn, runs_dir)
+
+
+def list_runs(
+    runs_dir: Path,
+    offset: int = 0,
+    limit: int = 50,
+    sort: str = "run_id",
+    descending: bool = True,
+) -> tuple[list[dict[str, Any]], int]:
+    if sort not in SORT_COLUMNS:
+        sort = "run_id"
+    direction = "DESC" if descending else "ASC"
+    with closing(_connect(runs_dir)) as conn:
+        total = conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+        rows = conn.execute(
+            f"SELECT run_id, mode, rows_left, rows_right, errors, warnings, infos FROM runs "
+            f"ORDER BY {sort} {direction}, run_id {direction} LIMIT ? OFFSET ?",
+            (max(1, limit), max(0, offset)),
+        ).fetchall()
+    return [dict(row) for row in rows], total
+
+
+def feed_runs(runs_dir: Path, feed: str, signature: str) -> list[str]:
+    # Incremental runs of a feed, newest first.
+    with closing(_connect(runs_dir)) as conn:
+        rows = conn.execute(
+            "SELECT run_id FROM runs WHERE json_extract(report, '$.delta.feed') = ? "
+            "AND json_extract(report, '$.delta.signature') = ? ORDER BY run_id DESC",
+            (feed, signature),
+        ).fetchall()
+    return [row["run_id"] for row in rows]
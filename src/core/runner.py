@@ -8,46 +8,160 @@ from typing import Any
 import polars as pl
 import yaml
 
+from .delta import delta_keys, run_delta
 from .html_report import write_html_report
-from .io import read_csv
-from .issue_writer import write_issues
-from .models import Issue, RunSummary
-from .utils import ensure_dir, generate_run_id, write_json
-from ..validators import (
-    allowed_values,
-    compare_fields,
-    cross_file_match,
-    range as range_validator,
-    regex,
-    required_columns,
-    required_non_null,
-    row_rules,
-    type_checks,
-    unique_key,
-)
-
-VALIDATOR_MAP = {
-    "required_columns": required_columns,
-    "required_non_null": required_non_null,
-    "unique_key": unique_key,
-    "allowed_values": allowed_values,
-    "regex": regex,
-    "type_checks": type_checks,
-    "range": range_validator,
-    "row_rules": row_rules,
-    "cross_file_match": cross_file_match,
-    "compare_fields": compare_fields,
-}
+from .input_cache import input_cache
+from .io import ARTIFACT_FORMATS, DEFAULT_ARTIFACT_FORMAT, artifact_name, read_csv_columns, scan_csv, write_rows
+from .issue_index import write_issue_index
+from .issue_writer import bad_rows, concat_issues, paired_keys, write_issues
+from .models import RuleResult, RunSummary
+from .profiler import PROFILE_FILE, frame_profile
+from .result_cache import result_cache, result_key
+from .rollup import ROLLUP_FILE, cap_rollup, is_capped, merge_rollups, result_rollup, write_rollup
+from .rule_compiler import compile_rules
+from .rules_loader import referenced_columns
+from .run_index import record_run
+from .timing import StageTimer
+from .utils import ensure_dir, generate_run_id, parallel_map, write_json
+from .streaming import run_streaming
+from ..validators import VALIDATOR_MAP, run_rule
 
 
 class RunResult:
-    def __init__(self, run_id: str, run_dir: Path, summary: RunSummary, issues: list[Issue]):
+    def __init__(self, run_id: str, run_dir: Path, summary: RunSummary, issues: pl.DataFrame):
         self.run_id = run_id
         self.run_dir = run_dir
         self.summary = summary
         self.issues = issues
 
 
+def _run_validators(
+    validators: list[dict[str, Any]],
+    df_left: pl.DataFrame,
+    df_right: pl.DataFrame | None,
+    run_id: str,
+    mode: str,
+    mapping: dict[str, Any] | None,
+    max_workers: int | None = None,
+    skip: set[int] | None = None,
+    timer: StageTimer | None = None,
+    fuse: bool = True,
+) -> list[RuleResult | None]:
+    skip = skip or set()
+    timer = timer or StageTimer()
+    right_columns = df_right.columns if df_right is not None else []
+    rows = df_left.height + (df_right.height if df_right is not None else 0)
+    active = {idx: rule for idx, rule in enumerate(validators) if idx not in skip}
+    compiled = compile_rules(active if fuse else {}, mode, df_left.columns, right_columns)
+    rest = [idx for idx in active if idx not in compiled]
+
+    def evaluate(task: int | None):
+        if task is not None:
+            with timer.stage("validator", index=task, type=validators[task].get("type"), rows=rows):
+                return {task: run_rule(validators[task], df_left, df_right, run_id, mode, mapping)}
+        if not compiled.rules:
+            return {}
+        # The fused rules share one scan, so they are timed as a group.
+        with timer.stage("validators_fused", rules=list(compiled.rules), rows=rows):
+            try:
+                return compiled.run(df_left, df_right, run_id)
+            except Exception:
+                # One rule failing inside the fused plan should not sink the
+                # others; fall back to evaluating them one by one.
+                return {
+                    idx: run_rule(validators[idx], df_left, df_right, run_id, mode, mapping)
+                    for idx in compiled.rules
+                }
+
+    # The compiled rules share one query plan; the remaining validators run
+    # alongside it on threads since Polars releases the GIL.
+    results: dict[int, RuleResult | None] = {}
+    for partial in parallel_map(evaluate, [None] + rest, max_workers):
+        results.update(partial)
+    return [results.get(idx) for idx in range(len(validators))]
+
+
+def _collect(
+    validators: list[dict[str, Any]],
+    results: list[RuleResult | None],
+    max_detail: int | None,
+) -> tuple[
+    list[pl.DataFrame],
+    list[pl.DataFrame],
+    set[int],
+    set[int],
+    tuple[set[str], set[int]],
+    dict[str, int],
+    list[dict[str, Any]],
+]:
+    issue_frames: list[pl.DataFrame] = []
+    rollups: list[pl.DataFrame] = []
+    bad_left: set[int] = set()
+    bad_right: set[int] = set()
+    pair_keys: set[str] = set()
+    pair_rows: set[int] = set()
+    counts: dict[str, int] = {}
+    rule_reports: list[dict[str, Any]] = []
+    remaining = max_detail
+    for idx, (rule, result) in enumerate(zip(validators, results)):
+        if result is None:
+            continue
+        issues = result.issues
+        if remaining is not None:
+            # The run-wide limit keeps the first rules' detail, in rule order.
+            issues = issues.head(max(remaining, 0))
+            remaining -= issues.height
+        issue_frames.append(issues)
+        # In-memory runs are capped like streaming ones so the rollup looks
+        # the same whichever way the run went.
+        rollup = cap_rollup(result_rollup(result))
+        rollups.append(rollup)
+        # Bad rows follow the detail rows that were kept after every cap.
+        kept_left, kept_right = bad_rows(issues)
+        bad_left |= kept_left
+        bad_right |= kept_right
+        keys = paired_keys(issues)
+        if keys:
+            pair_keys |= keys
+            pair_rows |= result.bad_right
+        for severity, total in result.counts.items():
+            counts[severity] = counts.get(severity, 0) + total
+        total = sum(result.counts.values())
+        rule_reports.append(
+            {
+                "index": idx,
+                "type": rule.get("type"),
+                "issues": total,
+                "detail": issues.height,
+                "truncated": total > issues.height,
+                "rollup_truncated": is_capped(rollup),
+            }
+        )
+    return issue_frames, rollups, bad_left, bad_right, (pair_keys, pair_rows), counts, rule_reports
+
+
+def _paired_rows(
+    path: Path,
+    key: str | None,
+    keys: set[str],
+    candidates: set[int],
+    frame: pl.DataFrame | None,
+) -> set[int]:
+    # The right rows of kept pair issues: the rule's flagged right rows whose
+    # key is still among the kept detail.
+    if not key or not keys or not candidates or key not in read_csv_columns(path):
+        return set()
+    source = frame.lazy() if frame is not None else scan_csv(path).select(key)
+    rows = pl.Series("rows", sorted(candidates), dtype=pl.UInt32)
+    matched = (
+        source.with_row_index("__row_index")
+        .filter(pl.col("__row_index").is_in(rows) & pl.col(key).cast(pl.String).is_in(pl.Series(sorted(keys))))
+        .select("__row_index")
+        .collect()
+    )
+    return set(matched["__row_index"].to_list())
+
+
 def run_validation(
     mode: str,
     left_path: Path,
@@ -55,16 +169,42 @@ def run_validation(
     rules: dict[str, Any],
     mapping: dict[str, Any] | None,
     runs_dir: Path,
+    streaming: bool | None = None,
+    memory_limit_mb: int | None = None,
+    run_id: str | None = None,
+    artifact_format: str | None = None,
+    incremental: bool | None = None,
 ) -> RunResult:
-    run_id = generate_run_id()
+    if streaming is None:
+        streaming = bool(rules.get("streaming", False))
+    if incremental is None:
+        incremental = bool(rules.get("incremental", False))
+    keys = delta_keys(rules, mapping, mode) if incremental else (None, None)
+    if incremental and streaming:
+        raise ValueError("incremental runs are not supported in streaming mode")
+    if incremental and keys[0] is None:
+        raise ValueError("incremental runs need a key column; set delta_key in the rules file")
+    memory_limit_mb = memory_limit_mb or rules.get("memory_limit_mb")
+    artifact_format = artifact_format or rules.get("artifact_format") or DEFAULT_ARTIFACT_FORMAT
+    if artifact_format not in ARTIFACT_FORMATS:
+        raise ValueError(f"Unknown artifact_format {artifact_format!r}; expected one of {', '.join(ARTIFACT_FORMATS)}")
+    max_workers = rules.get("max_workers")
+    max_detail = rules.get("max_detail")
+    validators = rules.get("validators", []) or []
+    run_id = run_id or generate_run_id()
     run_dir = ensure_dir(runs_dir / run_id)
     logs_path = run_dir / "logs.txt"
     logs_path.write_text("Starting run\n")
+    timer = StageTimer(logs_path)
 
     inputs_payload = {
         "mode": mode,
         "left_path": str(left_path),
         "right_path": str(right_path) if right_path else None,
+        "streaming": streaming,
+        "incremental": incremental,
+        "memory_limit_mb": memory_limit_mb,
+        "artifact_format": artifact_format,
         "started_at": datetime.now().isoformat(),
     }
     write_json(run_dir / "inputs.json", inputs_payload)
@@ -73,57 +213,135 @@ def run_validation(
     if mapping:
         (run_dir / "mapping_used.yaml").write_text(yaml.safe_dump(mapping, sort_keys=False))
 
-    df_left = read_csv(left_path)
-    df_right = read_csv(right_path) if right_path else None
+    delta = None
+    cached: list[int] = []
+    profiles: dict[str, Any] = {}
+    if streaming:
+        # Reading and validating are interleaved batch by batch here.
+        with timer.stage("streaming") as stage:
+            streamed = run_streaming(mode, left_path, right_path, rules, mapping, run_id, run_dir, memory_limit_mb)
+            stage["rows"] = streamed.rows_left + streamed.rows_right
+        results = streamed.results
+        rows_left, rows_right = streamed.rows_left, streamed.rows_right
+    else:
+        left_columns, right_columns = referenced_columns(rules, mapping, mode)
+        if left_columns is not None and keys[0]:
+            left_columns.add(keys[0])
+        if right_columns is not None and keys[1]:
+            right_columns.add(keys[1])
+        # Parsed inputs are shared with the mapping wizard and earlier runs.
+        cache = input_cache(runs_dir)
+        with timer.stage("read_left") as stage:
+            df_left = cache.read(left_path, left_columns)
+            stage["rows"] = df_left.height
+        df_right = None
+        if right_path:
+            with timer.stage("read_right") as stage:
+                df_right = cache.read(right_path, right_columns)
+                stage["rows"] = df_right.height
+        done: dict[int, RuleResult] = {}
+        if incremental:
+            # Row rules only see new and changed rows; keyed rules still
+            # need every row and run as usual.
+            feed = str(rules.get("feed") or left_path.name)
+            with timer.stage("delta") as stage:
+                delta = run_delta(validators, df_left, df_right, run_id, mode, mapping, runs_dir, run_dir, feed, keys)
+                stage["rows"] = delta.report["validated_left"] + delta.report["validated_right"]
+            done.update(delta.results)
+        stored = {}
+        if rules.get("result_cache", True):
+            # Rules whose config and input columns are unchanged reuse the
+            # result of an earlier run; only the rest are evaluated.
+            results_cache = result_cache(runs_dir)
+            with timer.stage("result_cache") as stage:
+                digests = (cache.key(left_path), cache.key(right_path) if right_path else None)
+                stored = {
+                    idx: result_key(rule, mode, mapping, df_left, df_right, digests)
+                    for idx, rule in enumerate(validators)
+                    if idx not in done
+                }
+                for idx, key in stored.items():
+                    hit = results_cache.get(key, run_id)
+                    if hit is not None:
+                        done[idx] = hit
+                        cached.append(idx)
+                stage["hits"] = len(cached)
+        results = _run_validators(
+            validators,
+            df_left,
+            df_right,
+            run_id,
+            mode,
+            mapping,
+            max_workers,
+            skip=set(done),
+            timer=timer,
+            fuse=bool(rules.get("fuse_rules", True)),
+        )
+        for idx, outcome in done.items():
+            results[idx] = outcome
+        for idx, key in stored.items():
+            if results[idx] is not None and idx not in done:
+                results_cache.put(key, results[idx])
+        rows_left = df_left.height
+        rows_right = df_right.height if df_right is not None else 0
+        # Profiles of the loaded columns are cached per file like the frames.
+        with timer.stage("profile", rows=rows_left + rows_right):
+            profiles["left"] = frame_profile(runs_dir, left_path, df_left)
+            if df_right is not None:
+                profiles["right"] = frame_profile(runs_dir, right_path, df_right)
 
-    issues: list[Issue] = []
-    bad_left: set[int] = set()
-    bad_right: set[int] = set()
+    with timer.stage("write_issues") as stage:
+        issue_frames, rollups, bad_left, bad_right, paired, counts, rule_reports = _collect(
+            validators, results, int(max_detail) if max_detail is not None else None
+        )
+        issues = concat_issues(issue_frames)
+        stage["rows"] = issues.height
+        # issues.parquet always backs the issue views; the download copy
+        # follows the run's artifact format.
+        artifacts = {"issues": artifact_name("issues", artifact_format)}
+        write_issues(run_dir / "issues.parquet", issues, "parquet")
+        if artifact_format != "parquet":
+            write_issues(run_dir / artifacts["issues"], issues, artifact_format)
+        write_issue_index(run_dir, issues)
+        # The rollup covers every violation, not just the kept detail rows.
+        rollup = merge_rollups(rollups)
+        artifacts["rollup"] = artifact_name("rollup", artifact_format)
+        write_rollup(run_dir / ROLLUP_FILE, rollup, "parquet")
+        if artifact_format != "parquet":
+            write_rollup(run_dir / artifacts["rollup"], rollup, artifact_format)
 
-    validators = rules.get("validators", [])
-    for rule in validators:
-        validator_type = rule.get("type")
-        handler = VALIDATOR_MAP.get(validator_type)
-        if not handler:
-            continue
-        if validator_type == "compare_fields":
-            new_issues, bad_left_new, bad_right_new = handler.run(
-                df_left, df_right, rule, run_id, mode, mapping
-            )
+    if profiles:
+        artifacts["profile"] = PROFILE_FILE
+        write_json(run_dir / PROFILE_FILE, profiles)
+
+    with timer.stage("bad_rows") as stage:
+        if mode == "compare" and right_path is not None:
+            key = ((mapping or {}).get("keys") or {}).get("right")
+            if paired[1]:
+                frame = None if streaming else input_cache(runs_dir).read(right_path, [key])
+                bad_right |= _paired_rows(right_path, key, *paired, frame)
+            exports = [("bad_rows_left", left_path, bad_left), ("bad_rows_right", right_path, bad_right)]
         else:
-            new_issues, bad_left_new, bad_right_new = handler.run(
-                df_left, df_right, rule, run_id, mode
-            )
-        issues.extend(new_issues)
-        bad_left |= bad_left_new
-        bad_right |= bad_right_new
-
-    write_issues(run_dir / "issues.csv", issues)
-
-    if mode == "compare" and df_right is not None:
-        if bad_left:
-            df_left.filter(pl.arange(0, df_left.height).is_in(list(bad_left))).write_csv(
-                run_dir / "bad_rows_left.csv"
-            )
-        if bad_right:
-            df_right.filter(pl.arange(0, df_right.height).is_in(list(bad_right))).write_csv(
-                run_dir / "bad_rows_right.csv"
-            )
-    else:
-        if bad_left:
-            df_left.filter(pl.arange(0, df_left.height).is_in(list(bad_left))).write_csv(
-                run_dir / "bad_rows.csv"
-            )
+            exports = [("bad_rows", left_path, bad_left)]
+        stage["rows"] = len(bad_left) + len(bad_right)
+        for stem, source, rows in exports:
+            if rows:
+                artifacts[stem] = artifact_name(stem, artifact_format)
+                # In-memory runs take every column from the input cache, so
+                # repeat runs do not parse the CSV again for the export.
+                frame = None if streaming else input_cache(runs_dir).read(source)
+                write_rows(source, rows, run_dir / artifacts[stem], artifact_format, frame)
 
     summary = RunSummary(
         run_id=run_id,
         mode=mode,
         started_at=datetime.now(),
-        total_rows_left=df_left.height,
-        total_rows_right=df_right.height if df_right is not None else 0,
-        errors=sum(1 for issue in issues if issue.severity == "ERROR"),
-        warnings=sum(1 for issue in issues if issue.severity == "WARN"),
-        infos=sum(1 for issue in issues if issue.severity == "INFO"),
+        total_rows_left=rows_left,
+        total_rows_right=rows_right,
+        errors=counts.get("ERROR", 0),
+        warnings=counts.get("WARN", 0),
+        infos=counts.get("INFO", 0),
     )
 
     report = {
@@ -134,9 +352,24 @@ def run_validation(
         "errors": summary.errors,
         "warnings": summary.warnings,
         "infos": summary.infos,
+        "artifact_format": artifact_format,
+        "artifacts": artifacts,
+        "rollup_groups": rollup.height,
+        "rollup_truncated": any(item["rollup_truncated"] for item in rule_reports),
+        "truncated": any(item["truncated"] for item in rule_reports),
+        "rules": rule_reports,
     }
+    if cached:
+        report["cached_rules"] = cached
+    if delta is not None:
+        report["delta"] = delta.report
+    report["timings"] = timer.summary()
+    timer.log(
+        f"Finished run in {report['timings']['seconds']:.3f}s wall, {report['timings']['cpu_seconds']:.3f}s cpu"
+    )
     write_json(run_dir / "report.json", report)
     (run_dir / "summary.txt").write_text(json.dumps(report, indent=2))
     write_html_report(run_dir / "report.html", report)
+    record_run(runs_dir, report)
 
     return RunResult(run_id=run_id, run_dir=run_dir, summary=summary, issues=issues)
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import math
+import shutil
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator
+
+import polars as pl
+
+from .io import read_csv_columns, scan_csv
+from .issue_writer import bad_rows, concat_issues, first_per_side, head_per_side, remap_rows
+from .models import RuleResult
+from .rollup import MAX_GROUPS, cap_rollup, merge_rollups, remap_rollup, result_rollup, shift_rollup
+from .rule_compiler import compile_rules, detail_limit
+from .rules_loader import referenced_columns
+from .utils import ensure_dir, env_int
+from ..validators import run_rule
+
+DEFAULT_MEMORY_LIMIT_MB = env_int("CSV_VALIDATOR_MEMORY_MB", 1024)
+ROW_INDEX = "__row_index"
+
+# Validators whose result for a row depends only on that row.
+ROW_RULES = {"required_non_null", "allowed_values", "regex", "range", "type_checks", "row_rules"}
+# Validators that need every row sharing a key; their key state is spilled to disk.
+KEYED_RULES = {"unique_key", "cross_file_match", "compare_fields"}
+
+
+@dataclass
+class StreamResult:
+    results: list[RuleResult | None] = field(default_factory=list)
+    rows_left: int = 0
+    rows_right: int = 0
+
+
+class _Spill:
+    def __init__(self, directory: Path, buckets: int):
+        self.directory = directory
+        self.buckets = buckets
+        self.parts = 0
+
+    def add(self, name: str, batch: pl.DataFrame, key: str | None) -> None:
+        if not key or key not in batch.columns:
+            return
+        bucket = (pl.col(key).cast(pl.String).hash(seed=0) % self.buckets).alias("__bucket")
+        parts = batch.with_columns(bucket).partition_by("__bucket", as_dict=True)
+        for (idx,), part in parts.items():
+            target = ensure_dir(self.directory / name / str(idx))
+            part.drop("__bucket").write_ipc(target / f"{self.parts}.arrow")
+        self.parts += 1
+
+    def load(self, name: str, idx: int, empty: pl.DataFrame) -> pl.DataFrame:
+        target = self.directory / name / str(idx)
+        if not target.exists():
+            return empty
+        return pl.scan_ipc(target / "*.arrow").sort(ROW_INDEX).collect()
+
+
+def _projection(path: Path, columns: set[str] | None) -> list[str]:
+    header = read_csv_columns(path)
+    if columns is None:
+        return header
+    return [col for col in header if col in columns] or header[:1]
+
+
+def _empty(path: Path, columns: list[str]) -> pl.DataFrame:
+    return scan_csv(path).select(columns).head(0).collect()
+
+
+def _batch_rows(path: Path, columns: list[str], budget: int) -> int:
+    probe = scan_csv(path).select(columns).head(1000).collect()
+    per_row = max(1, probe.estimated_size() // max(probe.height, 1))
+    # Leave room for the casts and masks validators build per batch.
+    return max(1000, budget // (per_row * 8))
+
+
+def _bucket_count(paths: list[Path], budget: int) -> int:
+    size = sum(path.stat().st_size for path in paths)
+    return max(1, min(4096, math.ceil(size * 2 / budget)))
+
+
+def _iter_batches(path: Path, columns: list[str], budget: int) -> Iterator[tuple[int, pl.DataFrame]]:
+    offset = 0
+    frame = scan_csv(path).select(columns)
+    for batch in frame.collect_batches(chunk_size=_batch_rows(path, columns, budget)):
+        yield offset, batch
+        offset += batch.height
+
+
+def _partition_keys(rule: dict, mapping: dict | None, mode: str) -> tuple[str | None, str | None]:
+    if rule.get("type") == "compare_fields":
+        keys = (mapping or {}).get("keys") or {}
+        return keys.get("left"), keys.get("right")
+    key = rule.get("key")
+    if mode == "compare" and isinstance(key, dict):
+        return key.get("left"), key.get("right")
+    return key, None
+
+
+def run_streaming(
+    mode: str,
+    left_path: Path,
+    right_path: Path | None,
+    rules: dict[str, Any],
+    mapping: dict[str, Any] | None,
+    run_id: str,
+    work_dir: Path,
+    memory_limit_mb: int | None = None,
+) -> StreamResult:
+    budget = (memory_limit_mb or DEFAULT_MEMORY_LIMIT_MB) * 1024 * 1024
+    validators = rules.get("validators", []) or []
+    left_columns, right_columns = referenced_columns(rules, mapping, mode)
+    left_cols = _projection(left_path, left_columns)
+    right_cols = _projection(right_path, right_columns) if right_path else []
+    empty_left = _empty(left_path, left_cols)
+    empty_right = _empty(right_path, right_cols) if right_path else None
+
+    paths = [left_path] + ([right_path] if right_path else [])
+    spill_dir = work_dir / "_spill"
+    spill = _Spill(spill_dir, _bucket_count(paths, budget))
+    keyed = {idx: rule for idx, rule in enumerate(validators) if rule.get("type") in KEYED_RULES}
+    spill_columns = {
+        idx: referenced_columns({"validators": [rule]}, mapping, mode) for idx, rule in keyed.items()
+    }
+    detail: dict[int, list[pl.DataFrame]] = {idx: [] for idx in range(len(validators))}
+    detail_rows: dict[tuple[int, str], int] = {}
+    counts: dict[int, dict[str, int]] = {idx: {} for idx in range(len(validators))}
+    rollups: dict[int, list[pl.DataFrame]] = {idx: [] for idx in range(len(validators))}
+    keyed_bad: dict[int, tuple[set[int], set[int]]] = {idx: (set(), set()) for idx in keyed}
+    result = StreamResult()
+
+    def count(idx: int, outcome: RuleResult) -> None:
+        for severity, total in outcome.counts.items():
+            counts[idx][severity] = counts[idx].get(severity, 0) + total
+
+    def roll(idx: int, rollup: pl.DataFrame) -> None:
+        rollups[idx].append(cap_rollup(rollup))
+        pending = sum(frame.height for frame in rollups[idx])
+        if len(rollups[idx]) >= 32 or pending > 2 * MAX_GROUPS:
+            # Fold batch rollups together and keep only the largest groups,
+            # so many distinct bad values cannot outgrow the memory limit.
+            rollups[idx] = [cap_rollup(merge_rollups(rollups[idx]))]
+
+    def consume(side: str, path: Path, columns: list[str]) -> int:
+        rows = 0
+        for offset, batch in _iter_batches(path, columns, budget):
+            frames = (batch, empty_right) if side == "left" else (empty_left, batch)
+            # Every batch is evaluated so counts stay exact; detail stops
+            # accumulating once a rule reaches its max_detail.
+            active = {idx: rule for idx, rule in enumerate(validators) if rule.get("type") in ROW_RULES}
+            right_columns = frames[1].columns if frames[1] is not None else []
+            # All row rules of the batch are evaluated by one fused plan.
+            compiled = compile_rules(active, mode, frames[0].columns, right_columns)
+            try:
+                outcomes = compiled.run(frames[0], frames[1], run_id)
+            except Exception:
+                outcomes = {
+                    idx: run_rule(rule, frames[0], frames[1], run_id, mode, mapping)
+                    for idx, rule in active.items()
+                }
+            for idx, outcome in outcomes.items():
+                if outcome is None:
+                    continue
+                count(idx, outcome)
+                roll(idx, shift_rollup(result_rollup(outcome), offset))
+                room = detail_limit(validators[idx]) - detail_rows.get((idx, side), 0)
+                if outcome.issues.is_empty() or room <= 0:
+                    continue
+                issues = outcome.issues.head(room).with_columns(pl.col("row_index") + offset)
+                detail[idx].append(issues)
+                detail_rows[(idx, side)] = detail_rows.get((idx, side), 0) + issues.height
+            indexed = batch.with_row_index(ROW_INDEX, offset=offset)
+            for idx, rule in keyed.items():
+                wanted = spill_columns[idx][0 if side == "left" else 1]
+                keep = [col for col in batch.columns if wanted is None or col in wanted]
+                key = _partition_keys(rule, mapping, mode)[0 if side == "left" else 1]
+                spill.add(f"{idx}/{side}", indexed.select(keep + [ROW_INDEX]), key)
+            rows += batch.height
+        return rows
+
+    try:
+        result.rows_left = consume("left", left_path, left_cols)
+        if right_path and mode == "compare":
+            result.rows_right = consume("right", right_path, right_cols)
+
+        # Buckets are evaluated one at a time so only one is ever resident.
+        for idx, rule in keyed.items():
+            left_wanted, right_wanted = spill_columns[idx]
+            left_empty = empty_left.select(
+                [col for col in empty_left.columns if left_wanted is None or col in left_wanted]
+            ).with_row_index(ROW_INDEX)
+            right_empty = None
+            if empty_right is not None:
+                right_empty = empty_right.select(
+                    [col for col in empty_right.columns if right_wanted is None or col in right_wanted]
+                ).with_row_index(ROW_INDEX)
+            for bucket in range(spill.buckets):
+                left_part = spill.load(f"{idx}/left", bucket, left_empty)
+                right_part = spill.load(f"{idx}/right", bucket, right_empty) if right_empty is not None else None
+                outcome = run_rule(rule, left_part, right_part, run_id, mode, mapping)
+                if outcome is None:
+                    break
+                count(idx, outcome)
+                issues, bad_left, bad_right = outcome.issues, outcome.bad_left, outcome.bad_right
+                right_index = right_part[ROW_INDEX] if right_part is not None else None
+                roll(idx, remap_rollup(result_rollup(outcome), left_part[ROW_INDEX], right_index))
+                detail[idx].append(remap_rows(issues, left_part[ROW_INDEX], right_index))
+                if sum(frame.height for frame in detail[idx]) > 4 * detail_limit(rule):
+                    # Keep keyed detail bounded while buckets accumulate.
+                    detail[idx] = [first_per_side(concat_issues(detail[idx]), detail_limit(rule))]
+                if bad_left:
+                    keyed_bad[idx][0].update(left_part[ROW_INDEX].gather(sorted(bad_left)).to_list())
+                if bad_right and right_index is not None:
+                    keyed_bad[idx][1].update(right_index.gather(sorted(bad_right)).to_list())
+    finally:
+        shutil.rmtree(spill_dir, ignore_errors=True)
+
+    for idx, rule in enumerate(validators):
+        validator_type = rule.get("type")
+        limit = detail_limit(rule)
+        if validator_type in ROW_RULES:
+            issues = head_per_side(concat_issues(detail[idx]), limit)
+            outcome = RuleResult(issues, *bad_rows(issues), counts[idx], cap_rollup(merge_rollups(rollups[idx])))
+        elif validator_type in KEYED_RULES:
+            issues = first_per_side(concat_issues(detail[idx]), limit)
+            outcome = RuleResult(issues, *keyed_bad[idx], counts[idx], cap_rollup(merge_rollups(rollups[idx])))
+        else:
+            # Header-only checks such as required_columns.
+            outcome = run_rule(rule, empty_left, empty_right, run_id, mode, mapping)
+        result.results.append(outcome)
+    return result
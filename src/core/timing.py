@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+# How often RSS is sampled while a stage runs.
+SAMPLE_SECONDS = 0.01
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def rss_mb() -> float | None:
+    # Current resident set size; only Linux exposes it cheaply, elsewhere
+    # the memory columns stay empty.
+    try:
+        with open("/proc/self/statm", "rb") as handle:
+            pages = int(handle.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * PAGE_SIZE / (1024 * 1024)
+
+
+def format_stage(entry: dict[str, Any]) -> str:
+    name = entry["stage"]
+    if "index" in entry:
+        name = f"{name} #{entry['index']} {entry.get('type')}"
+    elif "rules" in entry:
+        name = f"{name} {entry['rules']}"
+    line = f"{name}: {entry['seconds']:.3f}s wall, {entry['cpu_seconds']:.3f}s cpu"
+    if entry.get("rows") is not None:
+        line += f", {entry['rows']} rows"
+        if entry.get("rows_per_second") is not None:
+            line += f" ({entry['rows_per_second']} rows/s)"
+    if entry.get("peak_rss_mb") is not None:
+        line += f", peak RSS {entry['peak_rss_mb']} MB"
+    return line
+
+
+class StageTimer:
+    # Records wall time, CPU time, throughput and peak RSS per stage of a run
+    # and appends a line per stage to the run log as it finishes. CPU time and
+    # RSS are process-wide, so stages that run concurrently share theirs.
+    def __init__(self, log_path: Path | None = None):
+        self.log_path = log_path
+        self.stages: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        # Running stages' peaks, raised by a sampler thread that lives only
+        # while a stage is running.
+        self._peaks: dict[int, list[float]] = {}
+        self._sampler: threading.Thread | None = None
+
+    def _sample(self) -> None:
+        while True:
+            rss = rss_mb()
+            with self._lock:
+                if not self._peaks or rss is None:
+                    self._sampler = None
+                    return
+                for peak in self._peaks.values():
+                    peak[0] = max(peak[0], rss)
+            time.sleep(SAMPLE_SECONDS)
+
+    @contextmanager
+    def stage(self, name: str, **labels: Any) -> Iterator[dict[str, Any]]:
+        # The body may set entry["rows"] once it knows how many rows it saw.
+        entry: dict[str, Any] = {"stage": name, **labels}
+        start_rss = rss_mb()
+        peak = [start_rss] if start_rss is not None else None
+        if peak is not None:
+            with self._lock:
+                self._peaks[id(peak)] = peak
+                if self._sampler is None:
+                    self._sampler = threading.Thread(target=self._sample, daemon=True)
+                    self._sampler.start()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield entry
+        finally:
+            if peak is not None:
+                with self._lock:
+                    self._peaks.pop(id(peak), None)
+        seconds = time.perf_counter() - wall
+        entry["started"] = round(wall - self._wall, 4)
+        entry["seconds"] = round(seconds, 4)
+        entry["cpu_seconds"] = round(time.process_time() - cpu, 4)
+        rows = entry.get("rows")
+        entry["rows_per_second"] = round(rows / seconds) if rows is not None and seconds > 0 else None
+        if peak is not None:
+            end_rss = rss_mb()
+            peak[0] = max(peak[0], end_rss if end_rss is not None else 0.0)
+        entry["peak_rss_mb"] = round(peak[0], 1) if peak is not None else None
+        with self._lock:
+            self.stages.append(entry)
+            self.log(format_stage(entry))
+
+    def log(self, line: str) -> None:
+        if self.log_path is None:
+            return
+        with self.log_path.open("a") as handle:
+            handle.write(line + "\n")
+
+    def summary(self) -> dict[str, Any]:
+        peaks = [entry["peak_rss_mb"] for entry in self.stages if entry["peak_rss_mb"] is not None]
+        return {
+            "seconds": round(time.perf_counter() - self._wall, 4),
+            "cpu_seconds": round(time.process_time() - self._cpu, 4),
+            "peak_rss_mb": max(peaks) if peaks else None,
+            "stages": sorted(self.stages, key=lambda entry: entry["started"]),
+        }
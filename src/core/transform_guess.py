@@ -2,67 +2,53 @@ from __future__ import annotations
 
 from collections import Counter
 import re
-from typing import Iterable
+from typing import Any
 
-from rapidfuzz import fuzz
+from rapidfuzz import fuzz, process
 
-from .normalize import apply_pipeline, digits_only
+from .normalize import apply_pipeline
+from .profiler import PATTERNS, detect_type
 
 
 YES_TOKENS = {"y", "yes", "true", "t", "1", "on"}
 NO_TOKENS = {"n", "no", "false", "f", "0", "off"}
+_NON_ALNUM = re.compile(r"[^a-z0-9]")
 
 
-def _detect_type(values: Iterable[str]) -> str:
-    sample = list(values)[:200]
-    if not sample:
-        return "text"
-    numeric = sum(v.replace(".", "", 1).isdigit() for v in sample)
-    emails = sum("@" in v for v in sample)
-    phones = sum(len(digits_only(v) or "") >= 10 for v in sample)
-    dates = sum("/" in v or "-" in v for v in sample)
-    best = max(
-        [(numeric, "numeric"), (emails, "email"), (phones, "phone"), (dates, "date")],
-        key=lambda item: item[0],
-    )
-    return best[1] if best[0] > 0 else "text"
+class _ColumnTable:
+    # What guessing needs from one column's profile, shared by every field
+    # that uses the column.
+    def __init__(self, profile: dict[str, Any]):
+        self.distinct = profile.get("values") or []
+        self.needs_trim = bool(profile.get("edge_whitespace"))
+        self.needs_collapse = bool(profile.get("repeated_whitespace"))
+        self.patterns = profile.get("patterns") or {}
+        self._normalized: dict[tuple[str, ...], list[str]] = {}
 
+    def normalized(self, steps: list[str], limit: int = 30) -> list[str]:
+        # Distinct normalized values in first-seen order; each distinct raw
+        # value goes through the pipeline once.
+        key = tuple(steps)
+        if key not in self._normalized:
+            seen: dict[str, None] = {}
+            for value in self.distinct:
+                output = apply_pipeline(str(value), steps)
+                if output is None:
+                    continue
+                output = str(output)
+                if output:
+                    seen.setdefault(output)
+                    if len(seen) >= limit:
+                        break
+            self._normalized[key] = list(seen)
+        return self._normalized[key]
 
-def _needs_trim(values: Iterable[str]) -> bool:
-    return any(v != v.strip() for v in values if v)
 
+_EMPTY = _ColumnTable({})
 
-def _needs_collapse(values: Iterable[str]) -> bool:
-    return any(re.search(r"\s{2,}", v or "") for v in values)
 
-
-def _normalize_values(values: Iterable[str], steps: list[str]) -> list[str]:
-    normalized: list[str] = []
-    for value in values:
-        if value is None:
-            continue
-        output = apply_pipeline(str(value), steps)
-        if output is None:
-            continue
-        output = str(output)
-        if output:
-            normalized.append(output)
-    return normalized
-
-
-def _unique(values: Iterable[str], limit: int = 30) -> list[str]:
-    seen: list[str] = []
-    for value in values:
-        if value is None:
-            continue
-        value = str(value)
-        if not value:
-            continue
-        if value not in seen:
-            seen.append(value)
-        if len(seen) >= limit:
-            break
-    return seen
+def _match_key(value: str) -> str:
+    return _NON_ALNUM.sub("", value.lower())
 
 
 def _yes_no_map(values: list[str]) -> dict[str, str] | None:
@@ -90,19 +76,16 @@ def _yes_no_map(values: list[str]) -> dict[str, str] | None:
     return mapping or None
 
 
-def _best_match(value: str, candidates: set[str]) -> tuple[str | None, int]:
-    if not candidates:
-        return None, 0
-    normalized = re.sub(r"[^a-z0-9]", "", value.lower())
-    best_candidate = None
-    best_score = 0
-    for candidate in candidates:
-        cand_norm = re.sub(r"[^a-z0-9]", "", candidate.lower())
-        score = fuzz.ratio(normalized, cand_norm)
-        if score > best_score:
-            best_score = score
-            best_candidate = candidate
-    return best_candidate, best_score
+def _best_matches(values: list[str], candidates: list[str], cutoff: int = 92) -> dict[str, str]:
+    if not values or not candidates:
+        return {}
+    choices = [_match_key(candidate) for candidate in candidates]
+    matches: dict[str, str] = {}
+    for value in values:
+        found = process.extractOne(_match_key(value), choices, scorer=fuzz.ratio, processor=None, score_cutoff=cutoff)
+        if found:
+            matches[value] = candidates[found[2]]
+    return matches
 
 
 def _choose_canonical(left: str, right: str, counts: Counter[str]) -> str:
@@ -116,12 +99,12 @@ def _choose_canonical(left: str, right: str, counts: Counter[str]) -> str:
 
 
 def _suggest_value_map(
-    left_values: list[str],
-    right_values: list[str],
+    left: _ColumnTable,
+    right: _ColumnTable,
     normalize_steps: list[str],
 ) -> tuple[dict[str, str] | None, str | None]:
-    left_norm = _unique(_normalize_values(left_values, normalize_steps), limit=30)
-    right_norm = _unique(_normalize_values(right_values, normalize_steps), limit=30)
+    left_norm = left.normalized(normalize_steps)
+    right_norm = right.normalized(normalize_steps)
     if not left_norm or not right_norm:
         return None, None
     if len(left_norm) > 15 or len(right_norm) > 15:
@@ -140,19 +123,17 @@ def _suggest_value_map(
     counts = Counter(combined)
     mapping: dict[str, str] = {}
 
-    for value in left_set - right_set:
-        match, score = _best_match(value, right_set)
-        if match and score >= 92:
-            canonical = _choose_canonical(value, match, counts)
-            if value != canonical:
-                mapping[value] = canonical
+    left_only = [value for value in left_norm if value not in right_set]
+    right_only = [value for value in right_norm if value not in left_set]
+    for value, match in _best_matches(left_only, right_norm).items():
+        canonical = _choose_canonical(value, match, counts)
+        if value != canonical:
+            mapping[value] = canonical
 
-    for value in right_set - left_set:
-        match, score = _best_match(value, left_set)
-        if match and score >= 92:
-            canonical = _choose_canonical(match, value, counts)
-            if value != canonical and value not in mapping:
-                mapping[value] = canonical
+    for value, match in _best_matches(right_only, left_norm).items():
+        canonical = _choose_canonical(match, value, counts)
+        if value != canonical and value not in mapping:
+            mapping[value] = canonical
 
     if not mapping or len(mapping) > 12:
         return None, None
@@ -161,27 +142,37 @@ def _suggest_value_map(
 
 def guess_transformations(
     mapping_fields: dict[str, dict],
-    left_samples: dict[str, list[str]],
-    right_samples: dict[str, list[str]],
+    left_profile: dict[str, dict[str, Any]],
+    right_profile: dict[str, dict[str, Any]],
 ) -> dict[str, dict]:
     suggestions: dict[str, dict] = {}
+    left_tables: dict[str, _ColumnTable] = {}
+    right_tables: dict[str, _ColumnTable] = {}
+
+    def table(tables: dict[str, _ColumnTable], profile: dict[str, dict[str, Any]], column: str) -> _ColumnTable:
+        if column not in profile:
+            return _EMPTY
+        if column not in tables:
+            tables[column] = _ColumnTable(profile[column])
+        return tables[column]
+
     for field, config in mapping_fields.items():
-        left_col = config.get("left") or ""
-        right_col = config.get("right") or ""
-        left_values = left_samples.get(left_col, [])
-        right_values = right_samples.get(right_col, [])
-        combined = left_values + right_values
+        left = table(left_tables, left_profile, config.get("left") or "")
+        right = table(right_tables, right_profile, config.get("right") or "")
         normalize_steps: list[str] = []
         reasons: list[str] = []
 
-        if _needs_trim(combined):
+        if left.needs_trim or right.needs_trim:
             normalize_steps.append("trim")
             reasons.append("Trim whitespace")
-        if _needs_collapse(combined):
+        if left.needs_collapse or right.needs_collapse:
             normalize_steps.append("collapse_whitespace")
             reasons.append("Collapse repeated spaces")
 
-        detected = _detect_type(combined)
+        # Both sides' pattern counts decide the field's type together.
+        detected = detect_type(
+            {name: left.patterns.get(name, 0) + right.patterns.get(name, 0) for name in PATTERNS}
+        )
         if detected == "email":
             normalize_steps.append("normalize_email")
             reasons.append("Email-like values")
@@ -189,7 +180,7 @@ def guess_transformations(
             normalize_steps.append("normalize_phone_us")
             reasons.append("Phone-like values")
 
-        value_map, value_reason = _suggest_value_map(left_values, right_values, normalize_steps)
+        value_map, value_reason = _suggest_value_map(left, right, normalize_steps)
         if value_map and value_reason:
             reasons.append(value_reason)
 
@@ -3,8 +3,13 @@ from __future__ import annotations
 import json
 import os
 import secrets
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
+from typing import Callable, Iterable, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
 
 
 def generate_run_id() -> str:
@@ -52,3 +57,17 @@ def format_timestamp(dt: datetime) -> str:
 
 def env_int(name: str, default: int) -> int:
     return safe_int(os.getenv(name), default)
+
+
+def default_workers() -> int:
+    return env_int("CSV_VALIDATOR_WORKERS", min(32, os.cpu_count() or 1))
+
+
+def parallel_map(fn: Callable[[T], R], items: Iterable[T], max_workers: int | None = None) -> list[R]:
+    # Results come back in input order regardless of completion order.
+    items = list(items)
+    workers = min(max_workers or default_workers(), len(items))
+    if workers <= 1:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(fn, items))
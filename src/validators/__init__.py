@@ -11,7 +11,32 @@ from . import (
     unique_key,
 )
 
+VALIDATOR_MAP = {
+    "required_columns": required_columns,
+    "required_non_null": required_non_null,
+    "unique_key": unique_key,
+    "allowed_values": allowed_values,
+    "regex": regex,
+    "type_checks": type_checks,
+    "range": range,
+    "row_rules": row_rules,
+    "cross_file_match": cross_file_match,
+    "compare_fields": compare_fields,
+}
+
+
+def run_rule(rule: dict, df_left, df_right, run_id: str, mode: str, mapping: dict | None = None):
+    validator_type = rule.get("type")
+    handler = VALIDATOR_MAP.get(validator_type)
+    if not handler:
+        return None
+    if validator_type == "compare_fields":
+        return handler.run(df_left, df_right, rule, run_id, mode, mapping)
+    return handler.run(df_left, df_right, rule, run_id, mode)
+
+
 __all__ = [
+    "VALIDATOR_MAP",
     "allowed_values",
     "compare_fields",
     "cross_file_match",
@@ -20,6 +45,7 @@ __all__ = [
     "required_columns",
     "required_non_null",
     "row_rules",
+    "run_rule",
     "type_checks",
     "unique_key",
 ]
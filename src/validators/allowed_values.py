@@ -1,34 +1,29 @@
 from __future__ import annotations
 
-from ..core.models import Issue
+import polars as pl
 
+from ..core.rule_compiler import Check, run_checks
 
-def run(df_left, df_right, rule: dict, run_id: str, mode: str):
+
+def checks(rule: dict, left_columns: list[str], right_columns: list[str], mode: str) -> list[Check]:
     column = rule.get("column")
-    allowed = set(rule.get("values", []))
-    severity = rule.get("severity", "WARN")
-    if not column or column not in df_left.columns:
-        return [], set(), set()
-    series = df_left[column].cast(str).fill_null("")
-    issues: list[Issue] = []
-    bad_rows: set[int] = set()
-    for row_idx, value in enumerate(series.to_list()):
-        if value in allowed:
-            continue
-        if len(issues) >= 5000:
-            break
-        issues.append(
-            Issue(
-                run_id=run_id,
-                issue_id=f"allowed_{column}_{row_idx}",
-                severity=severity,
-                issue_type="DISALLOWED_VALUE",
-                message=f"Value not allowed in {column}",
-                file_side="SINGLE" if mode == "single" else "LEFT",
-                row_index=row_idx,
-                column=column,
-                left_value=value,
-            )
+    allowed = [str(value) for value in rule.get("values", []) if value is not None]
+    if not column or column not in left_columns:
+        return []
+    value = pl.col(column).cast(str).fill_null("")
+    return [
+        Check(
+            mask=~value.is_in(allowed),
+            severity=rule.get("severity", "WARN"),
+            issue_type="DISALLOWED_VALUE",
+            message=f"Value not allowed in {column}",
+            file_side="SINGLE" if mode == "single" else "LEFT",
+            column=column,
+            value=value,
         )
-        bad_rows.add(row_idx)
-    return issues, bad_rows, set()
+    ]
+
+
+def run(df_left, df_right, rule: dict, run_id: str, mode: str):
+    right_columns = df_right.columns if df_right is not None else []
+    return run_checks(checks(rule, df_left.columns, right_columns, mode), df_left, df_right, run_id, rule)
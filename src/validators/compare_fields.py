@@ -2,19 +2,31 @@ from __future__ import annotations
 
 import polars as pl
 
-from ..core.models import Issue
-from ..core.normalize import apply_pipeline
+from ..core.issue_writer import concat_issues, issue_frame
+from ..core.models import RuleResult
+from ..core.normalize import normalize_series
+from ..core.rollup import merge_rollups, rollup_issues
+from ..core.rule_compiler import detail_limit, no_issues
 
 
-def _apply_value_map(value: str | None, value_map: dict | None) -> str | None:
-    if value_map and value is not None:
-        return value_map.get(value, value)
-    return value
+def _blank(expr: pl.Expr) -> pl.Expr:
+    return expr.is_null() | (expr == "")
+
+
+def _number(expr: pl.Expr) -> pl.Expr:
+    return expr.str.strip_chars().cast(pl.Float64, strict=False)
+
+
+def _tolerance(value) -> float | None:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
 
 
 def run(df_left, df_right, rule: dict, run_id: str, mode: str, mapping: dict | None = None):
     if mode != "compare" or not mapping:
-        return [], set(), set()
+        return no_issues()
     fields = rule.get("fields", [])
     ignore_if_both_blank = rule.get("ignore_if_both_blank", False)
     severity = rule.get("severity", "WARN")
@@ -22,62 +34,78 @@ def run(df_left, df_right, rule: dict, run_id: str, mode: str, mapping: dict | N
     left_key = keys.get("left")
     right_key = keys.get("right")
     if not left_key or not right_key:
-        return [], set(), set()
+        return no_issues()
     if left_key not in df_left.columns or right_key not in df_right.columns:
-        return [], set(), set()
-
-    left_df = df_left.select([left_key] + [mapping["fields"][field]["left"] for field in fields if field in mapping.get("fields", {})])
-    right_df = df_right.select([right_key] + [mapping["fields"][field]["right"] for field in fields if field in mapping.get("fields", {})])
-    joined = left_df.join(right_df, left_on=left_key, right_on=right_key, how="inner", suffix="_right")
-
-    issues: list[Issue] = []
-    bad_left: set[int] = set()
-    bad_right: set[int] = set()
+        return no_issues()
 
+    field_maps = {}
     for field in fields:
         field_map = mapping.get("fields", {}).get(field)
         if not field_map:
             continue
-        left_col = field_map.get("left")
-        right_col = field_map.get("right")
-        if left_col not in joined.columns or f"{right_col}_right" not in joined.columns:
-            continue
-        normalize_steps = field_map.get("normalize", [])
+        if field_map.get("left") in df_left.columns and field_map.get("right") in df_right.columns:
+            field_maps[field] = field_map
+    if not field_maps:
+        return no_issues()
+
+    # Each side keeps its own row number through the join, and fields are
+    # aliased so identically named columns never collide.
+    cast = df_left.schema[left_key] != df_right.schema[right_key]
+    key_left = pl.col(left_key).cast(pl.String) if cast else pl.col(left_key)
+    key_right = pl.col(right_key).cast(pl.String) if cast else pl.col(right_key)
+    left_df = df_left.with_row_index("__left_row").select(
+        [pl.col("__left_row"), key_left.alias("__key")]
+        + [pl.col(field_map["left"]).alias(f"__left_{i}") for i, field_map in enumerate(field_maps.values())]
+    )
+    right_df = df_right.with_row_index("__right_row").select(
+        [pl.col("__right_row"), key_right.alias("__key")]
+        + [pl.col(field_map["right"]).alias(f"__right_{i}") for i, field_map in enumerate(field_maps.values())]
+    )
+    joined = (
+        left_df.filter(pl.col("__key").is_not_null())
+        .join(right_df, on="__key", how="inner")
+        .sort(["__left_row", "__right_row"])
+    )
+
+    frames: list[pl.DataFrame] = []
+    bad_left: set[int] = set()
+    bad_right: set[int] = set()
+    rollups: list[pl.DataFrame] = []
+    remaining = detail_limit(rule)
+    total = 0
+    for i, (field, field_map) in enumerate(field_maps.items()):
+        steps = field_map.get("normalize", []) or []
         value_map = field_map.get("value_map")
-        tolerance = field_map.get("tolerance")
-        left_series = joined[left_col].cast(str).fill_null("")
-        right_series = joined[f"{right_col}_right"].cast(str).fill_null("")
-        for row_idx, (left_val, right_val) in enumerate(zip(left_series.to_list(), right_series.to_list())):
-            left_norm = apply_pipeline(left_val, normalize_steps)
-            right_norm = apply_pipeline(right_val, normalize_steps)
-            left_norm = _apply_value_map(left_norm, value_map)
-            right_norm = _apply_value_map(right_norm, value_map)
-            if ignore_if_both_blank and not left_norm and not right_norm:
-                continue
-            equal = left_norm == right_norm
-            if not equal and tolerance is not None:
-                try:
-                    equal = abs(float(left_norm) - float(right_norm)) <= float(tolerance)
-                except (TypeError, ValueError):
-                    equal = False
-            if equal:
-                continue
-            if len(issues) >= 5000:
-                break
-            issues.append(
-                Issue(
-                    run_id=run_id,
-                    issue_id=f"compare_{field}_{row_idx}",
-                    severity=severity,
-                    issue_type="MISMATCH_FIELD",
-                    message=f"Field mismatch for {field}",
-                    file_side="BOTH",
-                    row_index=row_idx,
-                    column=field,
-                    left_value=left_norm,
-                    right_value=right_norm,
-                )
-            )
-            bad_left.add(row_idx)
-            bad_right.add(row_idx)
-    return issues, bad_left, bad_right
+        joined = joined.with_columns(
+            normalize_series(joined[f"__{side}_{i}"].cast(pl.String).fill_null(""), steps, value_map)
+            for side in ("left", "right")
+        )
+        left_norm = pl.col(f"__left_{i}")
+        right_norm = pl.col(f"__right_{i}")
+        mismatch = ~left_norm.eq_missing(right_norm)
+        tolerance = _tolerance(field_map.get("tolerance"))
+        if tolerance is not None:
+            within = (_number(left_norm) - _number(right_norm)).abs() <= tolerance
+            mismatch = mismatch & ~within.fill_null(False)
+        if ignore_if_both_blank:
+            mismatch = mismatch & ~(_blank(left_norm) & _blank(right_norm))
+        flagged = joined.select(
+            pl.col("__left_row").alias("row_index"),
+            pl.col("__right_row"),
+            pl.col("__key").cast(pl.String).alias("record_key"),
+            left_norm.alias("left_value"),
+            right_norm.alias("right_value"),
+            mismatch.alias("__mismatch"),
+        ).filter(pl.col("__mismatch"))
+        total += flagged.height
+        labels = {"severity": severity, "issue_type": "MISMATCH_FIELD", "file_side": "BOTH", "column": field}
+        rollups.append(rollup_issues(flagged.drop("__right_row", "__mismatch"), **labels))
+        if remaining <= 0:
+            continue
+        hits = flagged.head(remaining)
+        remaining -= hits.height
+        frames.append(issue_frame(hits, run_id=run_id, message=f"Field mismatch for {field}", **labels))
+        bad_left.update(hits["row_index"].to_list())
+        bad_right.update(hits["__right_row"].to_list())
+    counts = {severity: total} if total else {}
+    return RuleResult(concat_issues(frames), bad_left, bad_right, counts, merge_rollups(rollups))
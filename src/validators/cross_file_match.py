@@ -1,46 +1,63 @@
 from __future__ import annotations
 
-from ..core.models import Issue
+import polars as pl
+
+from ..core.issue_writer import concat_issues, issue_frame
+from ..core.models import RuleResult
+from ..core.rollup import merge_rollups, rollup_issues
+from ..core.rule_compiler import detail_limit, no_issues
+
+
+def _keys(df, column: str, cast: bool) -> pl.DataFrame:
+    key = pl.col(column).cast(str) if cast else pl.col(column)
+    return df.select(key.alias("key")).drop_nulls().unique(maintain_order=True)
 
 
 def run(df_left, df_right, rule: dict, run_id: str, mode: str):
     if mode != "compare":
-        return [], set(), set()
+        return no_issues()
     key = rule.get("key", {})
     left_key = key.get("left")
     right_key = key.get("right")
     severity = rule.get("severity", "WARN")
     if not left_key or not right_key:
-        return [], set(), set()
+        return no_issues()
     if left_key not in df_left.columns or right_key not in df_right.columns:
-        return [], set(), set()
-    left_values = set(df_left[left_key].drop_nulls().to_list())
-    right_values = set(df_right[right_key].drop_nulls().to_list())
-    left_missing = left_values - right_values
-    right_missing = right_values - left_values
-    issues: list[Issue] = []
-    for value in list(left_missing)[:5000]:
-        issues.append(
-            Issue(
+        return no_issues()
+    # Join on strings only when the two sides were inferred differently.
+    cast = df_left.schema[left_key] != df_right.schema[right_key]
+    left_values = _keys(df_left, left_key, cast)
+    right_values = _keys(df_right, right_key, cast)
+    left_missing = left_values.join(right_values, on="key", how="anti")
+    right_missing = right_values.join(left_values, on="key", how="anti")
+    total = left_missing.height + right_missing.height
+    rollup = merge_rollups(
+        [
+            rollup_issues(left_missing, severity=severity, issue_type="MISSING_IN_RIGHT", file_side="LEFT"),
+            rollup_issues(right_missing, severity=severity, issue_type="MISSING_IN_LEFT", file_side="RIGHT"),
+        ]
+    )
+    limit = detail_limit(rule)
+    left_missing = left_missing.head(limit)
+    right_missing = right_missing.head(limit)
+    issues = concat_issues(
+        [
+            issue_frame(
+                left_missing.select(pl.col("key").cast(str).alias("record_key")),
                 run_id=run_id,
-                issue_id=f"missing_right_{value}",
                 severity=severity,
                 issue_type="MISSING_IN_RIGHT",
                 message="Key missing from right file",
                 file_side="LEFT",
-                record_key=str(value),
-            )
-        )
-    for value in list(right_missing)[:5000]:
-        issues.append(
-            Issue(
+            ),
+            issue_frame(
+                right_missing.select(pl.col("key").cast(str).alias("record_key")),
                 run_id=run_id,
-                issue_id=f"missing_left_{value}",
                 severity=severity,
                 issue_type="MISSING_IN_LEFT",
                 message="Key missing from left file",
                 file_side="RIGHT",
-                record_key=str(value),
-            )
-        )
-    return issues, set(), set()
+            ),
+        ]
+    )
+    return RuleResult(issues, set(), set(), {severity: total} if total else {}, rollup)
@@ -1,43 +1,38 @@
 from __future__ import annotations
 
-from ..core.models import Issue
+import polars as pl
 
+from ..core.rule_compiler import Check, run_checks
 
-def run(df_left, df_right, rule: dict, run_id: str, mode: str):
+
+def checks(rule: dict, left_columns: list[str], right_columns: list[str], mode: str) -> list[Check]:
     column = rule.get("column")
-    severity = rule.get("severity", "WARN")
     min_value = rule.get("min")
     max_value = rule.get("max")
-    if not column or column not in df_left.columns:
-        return [], set(), set()
-    series = df_left[column].cast(float, strict=False)
-    issues: list[Issue] = []
-    bad_rows: set[int] = set()
-    for row_idx, value in enumerate(series.to_list()):
-        if value is None:
-            continue
-        if min_value is not None and value < min_value:
-            bad = True
-        elif max_value is not None and value > max_value:
-            bad = True
-        else:
-            bad = False
-        if not bad:
-            continue
-        if len(issues) >= 5000:
-            break
-        issues.append(
-            Issue(
-                run_id=run_id,
-                issue_id=f"range_{column}_{row_idx}",
-                severity=severity,
-                issue_type="OUT_OF_RANGE",
-                message=f"Value out of range in {column}",
-                file_side="SINGLE" if mode == "single" else "LEFT",
-                row_index=row_idx,
-                column=column,
-                left_value=str(value),
-            )
+    if not column or column not in left_columns:
+        return []
+    if min_value is None and max_value is None:
+        return []
+    value = pl.col(column).cast(float, strict=False)
+    if min_value is not None and max_value is not None:
+        out_of_range = ~value.is_between(min_value, max_value)
+    elif min_value is not None:
+        out_of_range = value < min_value
+    else:
+        out_of_range = value > max_value
+    return [
+        Check(
+            mask=out_of_range,
+            severity=rule.get("severity", "WARN"),
+            issue_type="OUT_OF_RANGE",
+            message=f"Value out of range in {column}",
+            file_side="SINGLE" if mode == "single" else "LEFT",
+            column=column,
+            value=value,
         )
-        bad_rows.add(row_idx)
-    return issues, bad_rows, set()
+    ]
+
+
+def run(df_left, df_right, rule: dict, run_id: str, mode: str):
+    right_columns = df_right.columns if df_right is not None else []
+    return run_checks(checks(rule, df_left.columns, right_columns, mode), df_left, df_right, run_id, rule)
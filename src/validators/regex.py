@@ -2,36 +2,49 @@ from __future__ import annotations
 
 import re
 
-from ..core.models import Issue
+import polars as pl
+from polars.exceptions import ComputeError
 
+from ..core.rule_compiler import Check, run_checks
 
-def run(df_left, df_right, rule: dict, run_id: str, mode: str):
+
+def _matches(value: pl.Expr, pattern: str) -> pl.Expr:
+    # Anchor at the start to keep re.match semantics.
+    anchored = f"^(?:{pattern})"
+    try:
+        pl.select(pl.lit("").str.contains(anchored))
+    except ComputeError:
+        # Patterns the Rust engine rejects (look-around, backrefs) are
+        # evaluated in Python, once per distinct value.
+        regex = re.compile(pattern)
+
+        def match(series: pl.Series) -> pl.Series:
+            matched = [item for item in series.unique().to_list() if regex.match(item)]
+            return series.is_in(matched)
+
+        return value.map_batches(match, return_dtype=pl.Boolean)
+    return value.str.contains(anchored)
+
+
+def checks(rule: dict, left_columns: list[str], right_columns: list[str], mode: str) -> list[Check]:
     column = rule.get("column")
     pattern = rule.get("pattern")
-    severity = rule.get("severity", "WARN")
-    if not column or not pattern or column not in df_left.columns:
-        return [], set(), set()
-    regex = re.compile(pattern)
-    series = df_left[column].cast(str).fill_null("")
-    issues: list[Issue] = []
-    bad_rows: set[int] = set()
-    for row_idx, value in enumerate(series.to_list()):
-        if regex.match(value):
-            continue
-        if len(issues) >= 5000:
-            break
-        issues.append(
-            Issue(
-                run_id=run_id,
-                issue_id=f"regex_{column}_{row_idx}",
-                severity=severity,
-                issue_type="REGEX_MISMATCH",
-                message=f"Value does not match regex for {column}",
-                file_side="SINGLE" if mode == "single" else "LEFT",
-                row_index=row_idx,
-                column=column,
-                left_value=value,
-            )
+    if not column or not pattern or column not in left_columns:
+        return []
+    value = pl.col(column).cast(str).fill_null("")
+    return [
+        Check(
+            mask=~_matches(value, pattern),
+            severity=rule.get("severity", "WARN"),
+            issue_type="REGEX_MISMATCH",
+            message=f"Value does not match regex for {column}",
+            file_side="SINGLE" if mode == "single" else "LEFT",
+            column=column,
+            value=value,
         )
-        bad_rows.add(row_idx)
-    return issues, bad_rows, set()
+    ]
+
+
+def run(df_left, df_right, rule: dict, run_id: str, mode: str):
+    right_columns = df_right.columns if df_right is not None else []
+    return run_checks(checks(rule, df_left.columns, right_columns, mode), df_left, df_right, run_id, rule)
@@ -1,11 +1,10 @@
 from __future__ import annotations
 
-from typing import Any
+from ..core.issue_writer import issues_to_frame, severity_counts
+from ..core.models import Issue, RuleResult
 
-from ..core.models import Issue
 
-
-def run(df_left, df_right, rule: dict, run_id: str, mode: str) -> tuple[list[Issue], set[int], set[int]]:
+def run(df_left, df_right, rule: dict, run_id: str, mode: str) -> RuleResult:
     issues: list[Issue] = []
     missing_left: list[str] = []
     missing_right: list[str] = []
@@ -43,4 +42,5 @@ def run(df_left, df_right, rule: dict, run_id: str, mode: str) -> tuple[list[Iss
                 column=col,
             )
         )
-    return issues, set(), set()
+    frame = issues_to_frame(issues)
+    return RuleResult(frame, set(), set(), severity_counts(frame))
@@ -2,35 +2,33 @@ from __future__ import annotations
 
 import polars as pl
 
-from ..core.models import Issue
+from ..core.rule_compiler import Check, no_issues, run_checks
 
 
-def run(df_left, df_right, rule: dict, run_id: str, mode: str):
+def checks(rule: dict, left_columns: list[str], right_columns: list[str], mode: str) -> list[Check]:
     expr = rule.get("expression")
-    severity = rule.get("severity", "WARN")
     if not expr:
-        return [], set(), set()
+        return []
     try:
-        mask = df_left.select(pl.sql_expr(expr)).to_series().fill_null(False)
+        mask = pl.sql_expr(expr)
     except Exception:
-        return [], set(), set()
-    issues: list[Issue] = []
-    bad_rows: set[int] = set()
-    for row_idx, is_bad in enumerate(mask.to_list()):
-        if not is_bad:
-            continue
-        if len(issues) >= 5000:
-            break
-        issues.append(
-            Issue(
-                run_id=run_id,
-                issue_id=f"row_rule_{row_idx}",
-                severity=severity,
-                issue_type="ROW_RULE",
-                message=rule.get("message", "Row rule failed"),
-                file_side="SINGLE" if mode == "single" else "LEFT",
-                row_index=row_idx,
-            )
+        return []
+    return [
+        Check(
+            mask=mask,
+            severity=rule.get("severity", "WARN"),
+            issue_type="ROW_RULE",
+            message=rule.get("message", "Row rule failed"),
+            file_side="SINGLE" if mode == "single" else "LEFT",
         )
-        bad_rows.add(row_idx)
-    return issues, bad_rows, set()
+    ]
+
+
+def run(df_left, df_right, rule: dict, run_id: str, mode: str):
+    right_columns = df_right.columns if df_right is not None else []
+    try:
+        return run_checks(checks(rule, df_left.columns, right_columns, mode), df_left, df_right, run_id, rule)
+    except Exception:
+        # Expressions that fail against the data (unknown columns, type
+        # mismatches) report nothing, as before.
+        return no_issues()
@@ -1,47 +1,36 @@
 from __future__ import annotations
 
-from ..core.models import Issue
-
-
-def _check(df, column: str, run_id: str, severity: str, side: str):
-    if column not in df.columns:
-        return [], set()
-    series = df[column]
-    dup_mask = series.is_duplicated()
-    idx = dup_mask.to_list()
-    issues: list[Issue] = []
-    bad_rows: set[int] = set()
-    for row_idx, is_dup in enumerate(idx):
-        if not is_dup:
-            continue
-        if len(issues) >= 5000:
-            break
-        issues.append(
-            Issue(
-                run_id=run_id,
-                issue_id=f"dup_{side}_{column}_{row_idx}",
-                severity=severity,
-                issue_type="DUPLICATE_KEY",
-                message=f"Duplicate key in {column}",
-                file_side=side,
-                row_index=row_idx,
-                column=column,
-                record_key=str(series[row_idx]) if series[row_idx] is not None else None,
-            )
+import polars as pl
+
+from ..core.rule_compiler import Check, run_checks
+
+
+def _check(column: str | None, available: list[str], severity: str, side: str) -> list[Check]:
+    if not column or column not in available:
+        return []
+    return [
+        Check(
+            mask=pl.col(column).is_duplicated(),
+            severity=severity,
+            issue_type="DUPLICATE_KEY",
+            message=f"Duplicate key in {column}",
+            file_side=side,
+            column=column,
+            record_key=pl.col(column).cast(str),
         )
-        bad_rows.add(row_idx)
-    return issues, bad_rows
+    ]
 
 
-def run(df_left, df_right, rule: dict, run_id: str, mode: str):
+def checks(rule: dict, left_columns: list[str], right_columns: list[str], mode: str) -> list[Check]:
     severity = rule.get("severity", "ERROR")
     if mode == "compare":
         key = rule.get("key", {})
-        left_key = key.get("left")
-        right_key = key.get("right")
-        issues_left, bad_left = _check(df_left, left_key, run_id, severity, "LEFT")
-        issues_right, bad_right = _check(df_right, right_key, run_id, severity, "RIGHT")
-        return issues_left + issues_right, bad_left, bad_right
-    key = rule.get("key")
-    issues, bad = _check(df_left, key, run_id, severity, "SINGLE")
-    return issues, bad, set()
+        return _check(key.get("left"), left_columns, severity, "LEFT") + _check(
+            key.get("right"), right_columns, severity, "RIGHT"
+        )
+    return _check(rule.get("key"), left_columns, severity, "SINGLE")
+
+
+def run(df_left, df_right, rule: dict, run_id: str, mode: str):
+    right_columns = df_right.columns if df_right is not None else []
+    return run_checks(checks(rule, df_left.columns, right_columns, mode), df_left, df_right, run_id, rule)
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import zlib
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Iterator
+
+from fastapi import Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+try:
+    import zstandard
+except ImportError:  # optional: pip install zstandard
+    zstandard = None
+
+CHUNK_BYTES = 1024 * 1024
+COMPRESS_MIN_BYTES = 1024
+COMPRESSIBLE_SUFFIXES = {".csv", ".txt", ".json", ".yaml", ".yml", ".html"}
+
+
+def _accepted_encodings(header: str) -> dict[str, float]:
+    accepted: dict[str, float] = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+    return accepted
+
+
+def _negotiate(request: Request, path: Path, size: int) -> str | None:
+    # Byte ranges refer to the stored file, so ranged requests are never compressed.
+    if "range" in request.headers or size < COMPRESS_MIN_BYTES:
+        return None
+    if path.suffix.lower() not in COMPRESSIBLE_SUFFIXES:
+        return None
+    accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+    candidates = (["zstd"] if zstandard is not None else []) + ["gzip"]
+    scored = [(accepted.get(name, accepted.get("*", 0.0)), -rank, name) for rank, name in enumerate(candidates)]
+    quality, _, name = max(scored)
+    return name if quality > 0 else None
+
+
+def _not_modified(request: Request, etag: str, mtime: float) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _compressed_chunks(path: Path, encoding: str) -> Iterator[bytes]:
+    if encoding == "zstd":
+        compressor = zstandard.ZstdCompressor().compressobj()
+    else:
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    with path.open("rb") as handle:
+        while chunk := handle.read(CHUNK_BYTES):
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+    yield compressor.flush()
+
+
+def file_response(request: Request, path: Path, media_type: str) -> Response:
+    stat = path.stat()
+    encoding = _negotiate(request, path, stat.st_size)
+    tag = f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+    etag = f'"{tag}-{encoding}"' if encoding else f'"{tag}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Vary": "Accept-Encoding",
+    }
+    if _not_modified(request, etag, stat.st_mtime):
+        return Response(status_code=304, headers=headers)
+    if encoding is None:
+        # FileResponse streams from disk and answers Range/If-Range requests.
+        return FileResponse(path, media_type=media_type, headers=headers, stat_result=stat)
+    headers["Content-Encoding"] = encoding
+    return StreamingResponse(_compressed_chunks(path, encoding), media_type=media_type, headers=headers)
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import mimetypes
+import os
+import secrets
 import webbrowser
+from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
 from typing import Any
+from urllib.parse import urlencode
 
 import uvicorn
 from fastapi import FastAPI, File, Form, Request, UploadFile
@@ -14,13 +19,18 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 import yaml
 
-from ..core.io import read_csv, read_csv_columns, sample_values
+from ..core.io import read_csv_columns
+from ..core.issue_index import load_issue_index, query_issues
+from ..core.rollup import load_rollup
 from ..core.mapping_guess import guess_mappings
 from ..core.mapping_store import load_mapping, save_mapping
+from ..core.profiler import PROFILE_FILE, sample_profile
 from ..core.rules_loader import load_rules
-from ..core.runner import run_validation
+from ..core.run_index import SORT_COLUMNS, list_runs, rebuild_index
+from ..core.jobs import JobQueue, read_status
 from ..core.transform_guess import guess_transformations
 from ..core.utils import ensure_dir, format_timestamp, human_bool, is_subpath, sanitize_filename
+from .downloads import file_response
 
 BASE_DIR = Path(__file__).resolve().parents[2]
 RULES_DIR = BASE_DIR / "rules"
@@ -29,8 +39,78 @@ RUNS_DIR = BASE_DIR / "runs"
 UPLOADS_DIR = RUNS_DIR / "_uploads"
 
 
-def create_app() -> FastAPI:
-    app = FastAPI()
+DEFAULT_MAX_CONCURRENT_RUNS = 2
+DEFAULT_MAX_UPLOAD_MB = 25
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+class UploadLimit:
+    # Counts request body bytes as they arrive and answers 413 as soon as
+    # the limit is passed, so chunked requests without a Content-Length are
+    # cut off too rather than spooled whole before the handler runs.
+    def __init__(self, app, limit: int, message: str):
+        self.app = app
+        self.limit = limit
+        self.message = message
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        length = headers.get(b"content-length", b"").decode("latin-1")
+        if length.isdigit() and int(length) > self.limit:
+            await Response(self.message, status_code=413)(scope, receive, send)
+            return
+        received = 0
+        started = False
+        rejected = False
+
+        async def limited_receive():
+            nonlocal received, rejected
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.limit and not started:
+                    rejected = True
+                    await Response(self.message, status_code=413)(scope, receive, send)
+                    raise UploadTooLarge(self.message)
+            return message
+
+        async def guarded_send(message):
+            nonlocal started
+            # Whatever the app answers after a rejection (e.g. its own
+            # body-parsing error) is dropped; the 413 has been sent.
+            if rejected:
+                return
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except UploadTooLarge:
+            if not rejected:
+                raise
+
+
+def create_app(
+    max_concurrent_runs: int = DEFAULT_MAX_CONCURRENT_RUNS,
+    max_upload_mb: int = DEFAULT_MAX_UPLOAD_MB,
+) -> FastAPI:
+    jobs = JobQueue(RUNS_DIR, max_workers=max_concurrent_runs)
+    max_upload_bytes = max_upload_mb * 1024 * 1024
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        yield
+        jobs.shutdown()
+
+    app = FastAPI(lifespan=lifespan)
     templates = Jinja2Templates(directory=str(BASE_DIR / "src" / "web" / "templates"))
 
     # Ensure consistent static asset MIME types on Windows.
@@ -78,31 +158,39 @@ def create_app() -> FastAPI:
             )
         return summaries
 
-    def _list_runs() -> list[dict[str, Any]]:
-        runs = []
-        for run_dir in sorted(RUNS_DIR.glob("*")):
-            if not run_dir.is_dir() or run_dir.name.startswith("_"):
-                continue
-            report_path = run_dir / "report.json"
-            if report_path.exists():
-                report = json.loads(report_path.read_text())
-                runs.append({
-                    "run_id": run_dir.name,
-                    "mode": report.get("mode"),
-                    "errors": report.get("errors", 0),
-                    "warnings": report.get("warnings", 0),
-                    "rows_left": report.get("rows_left", 0),
-                    "rows_right": report.get("rows_right", 0),
-                })
-        return sorted(runs, key=lambda item: item["run_id"], reverse=True)
-
-    def _save_upload(upload: UploadFile) -> Path:
+    # Two files may be uploaded per form; each is also held to the limit
+    # on its own as it is stored.
+    app.add_middleware(
+        UploadLimit,
+        limit=2 * max_upload_bytes + UPLOAD_CHUNK_BYTES,
+        message=f"Upload exceeds {max_upload_mb} MB",
+    )
+
+    async def _save_upload(upload: UploadFile) -> Path:
+        # Uploads are copied in chunks while hashed and stored once per content
+        # hash, so re-uploading the same file reuses the stored copy.
         ensure_dir(UPLOADS_DIR)
         filename = sanitize_filename(upload.filename or "upload.csv")
-        path = UPLOADS_DIR / f"{datetime.now().timestamp()}_{filename}"
-        with path.open("wb") as handle:
-            handle.write(upload.file.read())
-        return path
+        tmp = UPLOADS_DIR / f".{secrets.token_hex(8)}.part"
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with tmp.open("wb") as handle:
+                while chunk := await upload.read(UPLOAD_CHUNK_BYTES):
+                    size += len(chunk)
+                    if size > max_upload_bytes:
+                        raise UploadTooLarge(f"{filename} exceeds the {max_upload_mb} MB upload limit.")
+                    digest.update(chunk)
+                    handle.write(chunk)
+            target_dir = UPLOADS_DIR / digest.hexdigest()
+            existing = sorted(target_dir.glob("*")) if target_dir.exists() else []
+            if existing:
+                return existing[0]
+            path = ensure_dir(target_dir) / filename
+            os.replace(tmp, path)
+            return path
+        finally:
+            tmp.unlink(missing_ok=True)
 
     def _decorate_mapping_fields(
         fields: dict[str, dict[str, Any]],
@@ -133,7 +221,7 @@ def create_app() -> FastAPI:
 
     @app.get("/", response_class=HTMLResponse)
     async def home(request: Request):
-        runs = _list_runs()[:5]
+        runs, _ = list_runs(RUNS_DIR, limit=5)
         return templates.TemplateResponse("home.html", {"request": request, "runs": runs})
 
     @app.get("/new", response_class=HTMLResponse)
@@ -162,10 +250,23 @@ def create_app() -> FastAPI:
     ):
         left = Path(left_path) if left_path else None
         right = Path(right_path) if right_path else None
-        if left_upload and left_upload.filename:
-            left = _save_upload(left_upload)
-        if right_upload and right_upload.filename:
-            right = _save_upload(right_upload)
+        try:
+            if left_upload and left_upload.filename:
+                left = await _save_upload(left_upload)
+            if right_upload and right_upload.filename:
+                right = await _save_upload(right_upload)
+        except UploadTooLarge as exc:
+            return templates.TemplateResponse(
+                "new_run.html",
+                {
+                    "request": request,
+                    "rules": _list_rules(),
+                    "mappings": _list_mappings(),
+                    "mapping_summaries": _mapping_summaries(),
+                    "error": str(exc),
+                },
+                status_code=413,
+            )
 
         if not left or not left.exists():
             return templates.TemplateResponse(
@@ -206,33 +307,31 @@ def create_app() -> FastAPI:
 
         if mode == "compare" and mapping_choice == "existing" and mapping_file:
             mapping = load_mapping(MAPPINGS_DIR / mapping_file)
-            result = run_validation(mode, left, right, rules, mapping, RUNS_DIR)
-            return RedirectResponse(url=f"/runs/{result.run_id}", status_code=302)
+            run_id = jobs.submit(mode, left, right, rules, mapping)
+            return RedirectResponse(url=f"/runs/{run_id}", status_code=302)
 
         if mode == "compare" and mapping_choice == "create":
             return await mapping_new(request, left, right, rule_file)
 
-        result = run_validation(mode, left, right, rules, None, RUNS_DIR)
-        return RedirectResponse(url=f"/runs/{result.run_id}", status_code=302)
+        run_id = jobs.submit(mode, left, right, rules, None)
+        return RedirectResponse(url=f"/runs/{run_id}", status_code=302)
 
     @app.get("/mapping/new", response_class=HTMLResponse)
     async def mapping_new_get(request: Request, left_path: str, right_path: str, rule_file: str | None = None):
         return await mapping_new(request, Path(left_path), Path(right_path), rule_file)
 
     async def mapping_new(request: Request, left: Path, right: Path, rule_file: str | None):
-        left_df = read_csv(left)
-        right_df = read_csv(right)
-        left_samples = sample_values(left_df)
-        right_samples = sample_values(right_df)
-        suggestions = guess_mappings(left_df.columns, right_df.columns, left_samples, right_samples)
+        left_profile = sample_profile(RUNS_DIR, left)
+        right_profile = sample_profile(RUNS_DIR, right)
+        suggestions = guess_mappings(list(left_profile), list(right_profile), left_profile, right_profile)
         return templates.TemplateResponse(
             "mapping_columns.html",
             {
                 "request": request,
                 "left_path": str(left),
                 "right_path": str(right),
-                "left_columns": left_df.columns,
-                "right_columns": right_df.columns,
+                "left_columns": list(left_profile),
+                "right_columns": list(right_profile),
                 "suggestions": suggestions,
                 "mapping": None,
                 "mapping_name": "",
@@ -300,9 +399,9 @@ def create_app() -> FastAPI:
 
         suggestions: dict[str, dict] = {}
         if left_path and right_path:
-            left_df = read_csv(Path(left_path))
-            right_df = read_csv(Path(right_path))
-            suggestions = guess_transformations(fields, sample_values(left_df), sample_values(right_df))
+            suggestions = guess_transformations(
+                fields, sample_profile(RUNS_DIR, Path(left_path)), sample_profile(RUNS_DIR, Path(right_path))
+            )
 
         mapping_view = {
             "keys": {"left": left_key, "right": right_key},
@@ -391,21 +490,16 @@ def create_app() -> FastAPI:
 
         if action == "save_and_run" and left_path and right_path and rule_file:
             rules = load_rules(RULES_DIR / rule_file)
-            result = run_validation("compare", Path(left_path), Path(right_path), rules, mapping_payload, RUNS_DIR)
-            return RedirectResponse(url=f"/runs/{result.run_id}", status_code=302)
+            run_id = jobs.submit("compare", Path(left_path), Path(right_path), rules, mapping_payload)
+            return RedirectResponse(url=f"/runs/{run_id}", status_code=302)
 
         return RedirectResponse(url=f"/mapping/transform/{mapping_path.name}", status_code=302)
 
     @app.get("/mapping/guess")
     async def mapping_guess_endpoint(left_path: str, right_path: str):
-        left_df = read_csv(Path(left_path))
-        right_df = read_csv(Path(right_path))
-        suggestions = guess_mappings(
-            left_df.columns,
-            right_df.columns,
-            sample_values(left_df),
-            sample_values(right_df),
-        )
+        left_profile = sample_profile(RUNS_DIR, Path(left_path))
+        right_profile = sample_profile(RUNS_DIR, Path(right_path))
+        suggestions = guess_mappings(list(left_profile), list(right_profile), left_profile, right_profile)
         payload = [
             {
                 "left_column": item.left_column,
@@ -439,19 +533,74 @@ def create_app() -> FastAPI:
         return payload
 
     @app.get("/runs", response_class=HTMLResponse)
-    async def runs(request: Request):
-        return templates.TemplateResponse("runs.html", {"request": request, "runs": _list_runs()})
+    async def runs(request: Request, offset: int = 0, limit: int = 50, sort: str = "run_id", order: str = "desc"):
+        offset = max(0, offset)
+        limit = max(1, min(limit, 500))
+        descending = order != "asc"
+        page, total = list_runs(RUNS_DIR, offset, limit, sort, descending)
+
+        def runs_url(start: int, column: str = sort, direction: str = order) -> str:
+            return "/runs?" + urlencode({"offset": max(0, start), "limit": limit, "sort": column, "order": direction})
+
+        sort_urls = {
+            column: runs_url(0, column, "asc" if column == sort and descending else "desc")
+            for column in SORT_COLUMNS
+        }
+        return templates.TemplateResponse(
+            "runs.html",
+            {
+                "request": request,
+                "runs": page,
+                "total": total,
+                "first": offset + 1 if page else 0,
+                "last": offset + len(page),
+                "prev_url": runs_url(offset - limit) if offset > 0 else None,
+                "next_url": runs_url(offset + limit) if offset + len(page) < total else None,
+                "sort_urls": sort_urls,
+                "sort": sort,
+                "descending": descending,
+            },
+        )
+
+    @app.post("/runs/reindex")
+    async def runs_reindex():
+        rebuild_index(RUNS_DIR)
+        return RedirectResponse(url="/runs", status_code=302)
 
     @app.get("/runs/{run_id}", response_class=HTMLResponse)
-    async def run_detail(request: Request, run_id: str):
+    async def run_detail(request: Request, run_id: str, view: str = "rollup"):
         run_dir = RUNS_DIR / run_id
-        report = json.loads((run_dir / "report.json").read_text())
-        issues = []
-        issues_path = run_dir / "issues.csv"
-        if issues_path.exists():
-            lines = issues_path.read_text().splitlines()[1:501]
-            for line in lines:
-                issues.append(line.split(","))
+        report_path = run_dir / "report.json"
+        if not report_path.exists():
+            status = read_status(run_dir)
+            if not is_subpath(run_dir, RUNS_DIR) or status is None:
+                return Response("Run not found", status_code=404)
+            return templates.TemplateResponse(
+                "run_status.html",
+                {"request": request, "run_id": run_id, "status": status},
+            )
+        report = json.loads(report_path.read_text())
+        issues: list[list[Any]] = []
+        rollup: list[dict[str, Any]] = []
+        groups = 0
+        if view == "detail":
+            page, _ = query_issues(run_dir, limit=500)
+            issues = [list(row) for row in page.iter_rows()]
+        else:
+            view = "rollup"
+            page, groups = load_rollup(run_dir, limit=500)
+            rollup = page.to_dicts()
+        artifacts = report.get("artifacts")
+        if artifacts is None:
+            # Runs from before artifact formats were recorded wrote plain CSV.
+            artifacts = {
+                stem: f"{stem}.csv"
+                for stem in ("issues", "bad_rows", "bad_rows_left", "bad_rows_right")
+                if (run_dir / f"{stem}.csv").exists()
+            }
+        profiles = {}
+        if (run_dir / PROFILE_FILE).exists():
+            profiles = json.loads((run_dir / PROFILE_FILE).read_text())
         return templates.TemplateResponse(
             "run.html",
             {
@@ -459,32 +608,78 @@ def create_app() -> FastAPI:
                 "run_id": run_id,
                 "report": report,
                 "issues": issues,
+                "rollup": rollup,
+                "rollup_groups": groups,
+                "view": view,
+                "profiles": profiles,
+                "artifacts": artifacts,
             },
         )
 
+    @app.get("/runs/{run_id}/issues.json")
+    async def run_issues_json(
+        run_id: str,
+        offset: int = 0,
+        limit: int = 100,
+        severity: str | None = None,
+        issue_type: str | None = None,
+        column: str | None = None,
+        q: str | None = None,
+    ):
+        run_dir = RUNS_DIR / run_id
+        if not is_subpath(run_dir, RUNS_DIR) or not run_dir.exists():
+            return Response("Run not found", status_code=404)
+        page, total = query_issues(run_dir, offset, limit, severity, issue_type, column, q)
+        return {"total": total, "offset": offset, "limit": limit, "issues": page.to_dicts()}
+
     @app.get("/runs/{run_id}/issues", response_class=HTMLResponse)
-    async def run_issues(request: Request, run_id: str):
+    async def run_issues(
+        request: Request,
+        run_id: str,
+        offset: int = 0,
+        limit: int = 100,
+        severity: str | None = None,
+        issue_type: str | None = None,
+        column: str | None = None,
+        q: str | None = None,
+    ):
         run_dir = RUNS_DIR / run_id
-        issues = []
-        issues_path = run_dir / "issues.csv"
-        if issues_path.exists():
-            lines = issues_path.read_text().splitlines()[1:5001]
-            for line in lines:
-                issues.append(line.split(","))
+        if not is_subpath(run_dir, RUNS_DIR) or not run_dir.exists():
+            return Response("Run not found", status_code=404)
+        page, total = query_issues(run_dir, offset, limit, severity, issue_type, column, q)
+        filters = {"severity": severity, "issue_type": issue_type, "column": column, "q": q}
+        active = {key: value for key, value in filters.items() if value}
+
+        def page_url(start: int) -> str:
+            return f"/runs/{run_id}/issues?" + urlencode({**active, "offset": max(0, start), "limit": limit})
+
+        offset = max(0, offset)
         return templates.TemplateResponse(
             "run_issues.html",
-            {"request": request, "run_id": run_id, "issues": issues},
+            {
+                "request": request,
+                "run_id": run_id,
+                "issues": [list(row) for row in page.iter_rows()],
+                "total": total,
+                "first": offset + 1 if page.height else 0,
+                "last": offset + page.height,
+                "prev_url": page_url(offset - limit) if offset > 0 else None,
+                "next_url": page_url(offset + limit) if offset + page.height < total else None,
+                "facets": (load_issue_index(run_dir) or {}).get("facets", {}),
+                "filters": filters,
+                "limit": limit,
+            },
         )
 
     @app.get("/download/{run_id}/{filename}")
-    async def download_file(run_id: str, filename: str):
+    async def download_file(request: Request, run_id: str, filename: str):
         run_dir = RUNS_DIR / run_id
         file_path = run_dir / filename
-        if not file_path.exists():
-            return Response("Not found", status_code=404)
-        if not is_subpath(file_path, run_dir):
+        if not is_subpath(file_path, run_dir) or not is_subpath(run_dir, RUNS_DIR):
             return Response("Invalid path", status_code=400)
-        return Response(file_path.read_bytes(), media_type="application/octet-stream")
+        if not file_path.is_file():
+            return Response("Not found", status_code=404)
+        return file_response(request, file_path, "application/octet-stream")
 
     @app.get("/mappings", response_class=HTMLResponse)
     async def mappings(request: Request):
@@ -492,11 +687,13 @@ def create_app() -> FastAPI:
         return templates.TemplateResponse("mappings.html", {"request": request, "mappings": mappings})
 
     @app.get("/mappings/download/{mapping_name}")
-    async def mapping_download(mapping_name: str):
+    async def mapping_download(request: Request, mapping_name: str):
         mapping_path = MAPPINGS_DIR / mapping_name
-        if not mapping_path.exists():
+        if not is_subpath(mapping_path, MAPPINGS_DIR):
+            return Response("Invalid path", status_code=400)
+        if not mapping_path.is_file():
             return Response("Not found", status_code=404)
-        return Response(mapping_path.read_bytes(), media_type="text/yaml")
+        return file_response(request, mapping_path, "text/yaml")
 
     @app.post("/mappings/delete/{mapping_name}")
     async def mapping_delete(mapping_name: str):
@@ -509,8 +706,14 @@ def create_app() -> FastAPI:
     return app
 
 
-def run(host: str, port: int, open_browser: bool = True) -> None:
-    app = create_app()
+def run(
+    host: str,
+    port: int,
+    open_browser: bool = True,
+    max_concurrent_runs: int = DEFAULT_MAX_CONCURRENT_RUNS,
+    max_upload_mb: int = DEFAULT_MAX_UPLOAD_MB,
+) -> None:
+    app = create_app(max_concurrent_runs=max_concurrent_runs, max_upload_mb=max_upload_mb)
     if open_browser:
         webbrowser.open(f"http://{host}:{port}")
     uvicorn.run(app, host=host, port=port)
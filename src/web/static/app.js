@@ -1,42 +1,3 @@
-function setupIssueFilters() {
-  const table = document.getElementById('issues-table');
-  if (!table) return;
-  const searchInput = document.getElementById('issue-search');
-  const severitySelect = document.getElementById('issue-severity');
-  const typeSelect = document.getElementById('issue-type');
-  const rows = Array.from(table.querySelectorAll('tbody tr'));
-  const types = new Set();
-  rows.forEach(row => {
-    const type = row.children[2]?.innerText || '';
-    if (type) types.add(type);
-  });
-  types.forEach(type => {
-    const opt = document.createElement('option');
-    opt.value = type;
-    opt.textContent = type;
-    typeSelect.appendChild(opt);
-  });
-
-  function applyFilters() {
-    const search = (searchInput.value || '').toLowerCase();
-    const severity = severitySelect.value;
-    const type = typeSelect.value;
-    rows.forEach(row => {
-      const text = row.innerText.toLowerCase();
-      const rowSeverity = row.children[1]?.innerText || '';
-      const rowType = row.children[2]?.innerText || '';
-      const matches = (!search || text.includes(search)) &&
-        (!severity || rowSeverity === severity) &&
-        (!type || rowType === type);
-      row.style.display = matches ? '' : 'none';
-    });
-  }
-
-  searchInput.addEventListener('input', applyFilters);
-  severitySelect.addEventListener('change', applyFilters);
-  typeSelect.addEventListener('change', applyFilters);
-}
-
 function setupMappingTable() {
   const table = document.querySelector('.mapping-table');
   if (!table) return;
@@ -684,7 +645,6 @@ function setupNewRunForm() {
 }
 
 document.addEventListener('DOMContentLoaded', () => {
-  setupIssueFilters();
   setupMappingTable();
   setupCopyYaml();
   setupNewRunForm();
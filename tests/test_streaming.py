@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import polars as pl
+
+from src.core.rollup import MAX_GROUPS, OTHER_VALUE, is_capped
+from src.core.streaming import run_streaming
+
+
+def test_rollup_stays_bounded_with_many_distinct_violations(tmp_path: Path) -> None:
+    rows = 3 * MAX_GROUPS
+    path = tmp_path / "left.csv"
+    pl.select(pl.int_range(0, rows).alias("id")).with_columns(
+        pl.format("bad{}", pl.col("id")).alias("code")
+    ).write_csv(path)
+    rules = {"validators": [{"type": "regex", "column": "code", "pattern": "^ok$"}]}
+
+    # A tiny memory limit forces many small batches.
+    result = run_streaming("single", path, None, rules, None, "test", tmp_path / "work", memory_limit_mb=1)
+
+    rollup = result.results[0].rollup
+    assert rollup.height <= MAX_GROUPS + 1
+    assert is_capped(rollup)
+    assert rollup["count"].sum() == rows == result.results[0].counts["WARN"]
+    other = rollup.filter(pl.col("left_value") == OTHER_VALUE)
+    assert other.height == 1
+    assert other["count"].item() == rows - MAX_GROUPS